@@ -1,7 +1,6 @@
 import asyncio
 import os
 import sys
-import tempfile
 import streamlit as st
 if sys.platform == "linux" or sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.DefaultEventLoopPolicy())
@@ -10,6 +9,18 @@ if sys.platform == "linux" or sys.platform == "win32":
 from src.exception import CustomException
 from src.pipelines.format_verifier_pipeline import FormatVerifierPipeline
 from src.pipelines.metadata_extraction_pipeline import MetadataExtractionPipeline
+from src.components.result_cache import ResultCache
+from src.components.document_source import DocumentSource
+
+@st.cache_resource
+def get_result_cache():
+    # One on-disk result cache per server process: re-analysing the same PDF skips extraction
+    return ResultCache()
+
+@st.cache_resource
+def get_metadata_pipeline():
+    # Kept across clicks, so the fine-tuned BERT model is loaded once per server process
+    return MetadataExtractionPipeline(cache=get_result_cache())
 
 # Streamlit UI
 st.title("PDF Metadata Extractor & Formatting Compliance Analyzer")
@@ -63,11 +74,9 @@ if uploaded_file is not None:
     st.toast("File uploaded successfully!", icon="✅") 
 
     if st.button("Analyze the PDF"):
-        # Save uploaded file to a temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_pdf:
-            temp_pdf.write(uploaded_file.getbuffer())
-            temp_filename = temp_pdf.name  # Get the temporary file path
-        
+        # Open the upload straight from memory; both pipelines share this one document handle
+        pdf_source = DocumentSource(uploaded_file.getbuffer())
+
         try:
             # Prepare format verification input template
             format_verification_input = {
@@ -114,48 +123,52 @@ if uploaded_file is not None:
                     "citations_consistent": citations_consistent,
                 },
             }
-            # Call the ML pipeline with the file path
-            # Call your ML pipeline function (Ensure analyze_pdf returns two dictionaries)
-            me_pipeline = MetadataExtractionPipeline()
-            metadata_results, compliance_results = me_pipeline.extract(temp_filename)
-            
-            # Formatting Compliance Analysis
-            fv_pipeline = FormatVerifierPipeline(temp_filename, format_verification_input)
-            compliance_report,extracted_format = fv_pipeline.initiate_format_verification()
-            #compliance_report_format = {'Table of Contents (ToC)': 'Non-compliant', 'List of Figures (LoF)': 'Non-compliant', 'Abbreviations Section': 'Non-compliant', 'Font Type & Size': 'Incorrect', 'Header Fonts': 'Incorrect', 'Margins': 'Incorrect', 'Text Alignment': 'Justified', 'Figure Placement': 'Incorrect', 'Table Placement': 'Incorrect', 'References Formatting': 'Non-compliant'}
-            #extracted_format = {'table_of_contents': {'toc_present': True, 'heading_font_size': 16, 'subheading_font_size': 12}, 'list_of_figures': {'lof_present': True, 'figure_caption_font_size': 12}, 'abbreviations_section': {'abbreviations_section_present': True, 'abbreviations_sorted': 'asc'}, 'font_type_size': {'body_font_type': 'TimesNewRomanPSMT', 'body_font_size': 12, 'heading_font_type': 'TimesNewRomanPS-BoldMT', 'heading_font_size': 18}, 'margins': {'left_margin_inch': 1, 'right_margin_inch': 1, 'top_margin_inch': 2, 'bottom_margin_inch': 1}, 'text_alignment': {'text_alignment': 'Justified'}, 'figure_placement': {'figure_caption_font_size': 12, 'figure_placement': 'center', 'figure_caption_position': 'above'}, 'table_placement': {'table_caption_font_size': 12, 'table_placement': 'right', 'table_caption_position': 'above'}, 'references_formatting': {'references_format': None, 'citations_consistent': False}}
-            
             # Create two columns
             col1, col2 = st.columns([3, 3])
 
             with col1:
                 st.subheader("Extracted Metadata using Fine Tuned BERT")
-                st.json(metadata_results)
+                metadata_placeholder = st.empty()
 
             with col2:
                 st.subheader("Actual Metadata of uploaded PDF")
-                st.json(compliance_results)
+                compliance_results_placeholder = st.empty()
             # Create two more columns for Compliance Report and Extracted Format
             col3, col4 = st.columns([3, 3])
 
             with col3:
                 st.subheader("📌 Compliance Report")
-                compliance_df = [{"Category": key, "Compliance Status": value} for key, value in compliance_report.items()]
-                st.table(compliance_df)
+                compliance_placeholder = st.empty()
 
             with col4:
                 st.subheader("📌 Extracted Format")
-                
-                extracted_format_data = []
-                for category, details in extracted_format.items():
-                    for key, value in details.items():
-                        extracted_format_data.append({
-                            "Category": category, 
-                            "Property": key, 
-                            "Extracted Value": str(value)  # Convert all values to string
-                        })
-                
-                st.table(extracted_format_data)
+                extracted_format_placeholder = st.empty()
+
+            # Formatting Compliance Analysis, streamed section by section as each extractor finishes
+            compliance_df = []
+            extracted_format_data = []
+            fv_pipeline = FormatVerifierPipeline(pdf_source, format_verification_input, cache=get_result_cache())
+            for category, verdicts, details in fv_pipeline.iter_format_verification():
+                compliance_df.extend({"Category": key, "Compliance Status": value} for key, value in verdicts.items())
+                for key, value in details.items():
+                    extracted_format_data.append({
+                        "Category": category, 
+                        "Property": key, 
+                        "Extracted Value": str(value)  # Convert all values to string
+                    })
+                compliance_placeholder.table(compliance_df)
+                extracted_format_placeholder.table(extracted_format_data)
+            #compliance_report_format = {'Table of Contents (ToC)': 'Non-compliant', 'List of Figures (LoF)': 'Non-compliant', 'Abbreviations Section': 'Non-compliant', 'Font Type & Size': 'Incorrect', 'Header Fonts': 'Incorrect', 'Margins': 'Incorrect', 'Text Alignment': 'Justified', 'Figure Placement': 'Incorrect', 'Table Placement': 'Incorrect', 'References Formatting': 'Non-compliant'}
+            #extracted_format = {'table_of_contents': {'toc_present': True, 'heading_font_size': 16, 'subheading_font_size': 12}, 'list_of_figures': {'lof_present': True, 'figure_caption_font_size': 12}, 'abbreviations_section': {'abbreviations_section_present': True, 'abbreviations_sorted': 'asc'}, 'font_type_size': {'body_font_type': 'TimesNewRomanPSMT', 'body_font_size': 12, 'heading_font_type': 'TimesNewRomanPS-BoldMT', 'heading_font_size': 18}, 'margins': {'left_margin_inch': 1, 'right_margin_inch': 1, 'top_margin_inch': 2, 'bottom_margin_inch': 1}, 'text_alignment': {'text_alignment': 'Justified'}, 'figure_placement': {'figure_caption_font_size': 12, 'figure_placement': 'center', 'figure_caption_position': 'above'}, 'table_placement': {'table_caption_font_size': 12, 'table_placement': 'right', 'table_caption_position': 'above'}, 'references_formatting': {'references_format': None, 'citations_consistent': False}}
+
+            # Call the ML pipeline with the shared document
+            # Call your ML pipeline function (Ensure analyze_pdf returns two dictionaries)
+            me_pipeline = get_metadata_pipeline()
+            metadata_results, compliance_results = me_pipeline.extract(pdf_source)
+            metadata_placeholder.json(metadata_results)
+            compliance_results_placeholder.json(compliance_results)
         except CustomException as e:
             raise CustomException(e,sys)
+        finally:
+            pdf_source.close()
 
@@ -0,0 +1,78 @@
+"""
+Memory benchmark of the font statistics: per-span lists vs streaming aggregators.
+
+The PDFs are parsed first, so only the memory held by the statistics themselves is measured.
+--repeat walks the pages several times to mimic a longer document.
+
+Usage:
+    python -m benchmarks.font_memory dataset/pdfs/*.pdf --repeat 10
+"""
+import argparse
+import glob
+import os
+import tracemalloc
+from collections import Counter
+from src.components.extraction.aggregates import PageAggregates
+from src.components.extraction.format_extractor import FormatExtractor
+
+
+def list_font_stats(pages, repeat):
+    """The previous approach: every span's font name and size appended to two lists."""
+    font_sizes = []
+    font_types = []
+    for _ in range(repeat):
+        for page in pages:
+            for block in page.blocks:
+                for line in block.lines:
+                    for span in line.spans:
+                        font_sizes.append(round(span.size))
+                        font_types.append(span.font)
+    max_font_size = max(font_sizes) if font_sizes else None
+    heading_fonts = [font for font, size in zip(font_types, font_sizes) if size == max_font_size]
+    return font_sizes, font_types, heading_fonts
+
+
+def streaming_font_stats(pages, repeat):
+    """Streaming aggregators: one Counter over (font, size) pairs plus a running max."""
+    aggregates = PageAggregates()
+    for _ in range(repeat):
+        for page in pages:
+            for block in page.blocks:
+                for line in block.lines:
+                    for span in line.spans:
+                        aggregates.add_font(span.font, round(span.size))
+    return aggregates
+
+
+def measure(function, *args):
+    """Return (peak traced bytes, result) of one call."""
+    tracemalloc.start()
+    result = function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", default=sorted(glob.glob(os.path.join("dataset", "pdfs", "*.pdf"))))
+    parser.add_argument("--repeat", type=int, default=10, help="Number of passes over the pages")
+    args = parser.parse_args()
+
+    print(f"{'document':<32}{'spans':>10}{'lists KiB':>12}{'streaming KiB':>15}{'ratio':>8}")
+    for pdf_path in args.pdfs:
+        layout = FormatExtractor(pdf_path).layout
+        pages = list(layout)  # Parse up front, outside of the measurement
+        span_count = args.repeat * sum(len(line.spans) for page in pages for block in page.blocks for line in block.lines)
+
+        list_peak, (font_sizes, font_types, _) = measure(list_font_stats, pages, args.repeat)
+        stream_peak, aggregates = measure(streaming_font_stats, pages, args.repeat)
+        # Both approaches must agree on the statistics
+        assert Counter(font_types) == aggregates.font_types and Counter(font_sizes) == aggregates.font_sizes
+
+        ratio = list_peak / stream_peak if stream_peak else float("inf")
+        print(f"{os.path.basename(pdf_path):<32}{span_count:>10}{list_peak / 1024:>12.1f}{stream_peak / 1024:>15.1f}{ratio:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Parity and latency of the BERT NER inference backends (torch / onnx / onnx-int8).
+
+Texts are the annotated dataset records (dataset/annoted_dataset/*.json, tokens joined)
+plus the cleaned cover pages of dataset/pdfs. For every backend it reports:
+- parity against torch: share of tokens given the same label, and share of documents
+  whose convert_ner_results metadata is identical
+- latency: p50/p95 of one document per call, and documents/s of batched_ner
+
+Export the model first:
+    python -m src.components.model_exporter
+Usage:
+    python -m benchmarks.ner_backends --repeat 5 --min-agreement 0.98
+The run exits with status 1 when a backend agrees with torch on fewer tokens than --min-agreement.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from benchmarks.run import summarize
+from src.components.model_registry import INFERENCE_BACKENDS, ModelRegistryConfig
+from src.components.ner_inference import BatchedNERConfig, batched_ner
+from src.pipelines.utils import clean_pdf_text, convert_ner_results, extract_first_page_text
+
+
+def load_texts(annotated_dir, pdf_dir):
+    texts = []
+    for path in sorted(glob.glob(os.path.join(annotated_dir, "*.json"))):
+        with open(path) as f:
+            texts.extend(clean_pdf_text(" ".join(record["tokens"])) for record in json.load(f))
+    for path in sorted(glob.glob(os.path.join(pdf_dir, "*.pdf"))):
+        texts.append(clean_pdf_text(extract_first_page_text(path)))
+    return [text for text in texts if text]
+
+
+def parity(reference, candidate):
+    """Token label agreement and identical-metadata share of `candidate` against `reference` entities."""
+    tokens = agreeing = identical = 0
+    for expected, actual in zip(reference, candidate):
+        expected_labels = {entity["index"]: entity["entity"] for entity in expected}
+        actual_labels = {entity["index"]: entity["entity"] for entity in actual}
+        indices = expected_labels.keys() | actual_labels.keys()
+        tokens += len(indices)
+        agreeing += sum(expected_labels.get(index) == actual_labels.get(index) for index in indices)
+        identical += convert_ner_results(expected) == convert_ner_results(actual)
+    return {
+        "token_agreement": round(agreeing / tokens, 6) if tokens else 1.0,
+        "identical_metadata": round(identical / len(reference), 6) if reference else 1.0,
+    }
+
+
+def benchmark_backend(ner_pipeline, texts, repeat, batch_size):
+    latencies = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            ner_pipeline(text)
+            latencies.append(time.perf_counter() - start)
+
+    batched = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        entities = batched_ner(ner_pipeline, texts, BatchedNERConfig(batch_size=batch_size))
+        batched.append(time.perf_counter() - start)
+    result = {"single": summarize(latencies), "batched": summarize(batched)}
+    result["batched"]["documents_per_second"] = round(len(texts) / result["batched"]["p50_seconds"], 2)
+    return result, entities
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-path", default=ModelRegistryConfig.default_model_path)
+    parser.add_argument("--backends", nargs="+", default=list(INFERENCE_BACKENDS))
+    parser.add_argument("--annotated-dir", default=os.path.join("dataset", "annoted_dataset"))
+    parser.add_argument("--pdf-dir", default=os.path.join("dataset", "pdfs"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=BatchedNERConfig.batch_size)
+    parser.add_argument("--min-agreement", type=float, default=0.98, help="Token label agreement required against torch")
+    parser.add_argument("--output", default=os.path.join("artifacts", "benchmarks", "ner_backends.json"))
+    args = parser.parse_args(argv)
+
+    texts = load_texts(args.annotated_dir, args.pdf_dir)
+    print(f"{len(texts)} texts")
+    reference = None
+    results, failed = {}, False
+    for backend in ["torch"] + [backend for backend in args.backends if backend != "torch"]:
+        ner_pipeline = INFERENCE_BACKENDS[backend](args.model_path)
+        ner_pipeline(texts[0])  # Warm-up: first-call setup is not part of the latency
+        result, entities = benchmark_backend(ner_pipeline, texts, args.repeat, args.batch_size)
+        if reference is None:
+            reference = entities
+        result["parity"] = parity(reference, entities)
+        results[backend] = result
+        failed |= result["parity"]["token_agreement"] < args.min_agreement
+
+        speedup = results["torch"]["single"]["p50_seconds"] / result["single"]["p50_seconds"]
+        print(f"{backend:<10} single p50 {result['single']['p50_seconds'] * 1000:8.2f} ms  "
+              f"p95 {result['single']['p95_seconds'] * 1000:8.2f} ms  "
+              f"batched {result['batched']['documents_per_second']:8.1f} docs/s  "
+              f"x{speedup:.2f} vs torch  "
+              f"tokens agree {result['parity']['token_agreement']:.2%}  "
+              f"metadata identical {result['parity']['identical_metadata']:.2%}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"texts": len(texts), "batch_size": args.batch_size, "results": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
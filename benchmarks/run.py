@@ -0,0 +1,228 @@
+"""
+Benchmark harness for the extraction and verification paths.
+
+For every document (dataset/pdfs/*.pdf plus synthetic 50/200/1000-page PDFs) it measures:
+- format: FormatExtractor(...).extract_all() on a fresh extractor per run
+- compliance: generate_formatting_compliance_report on the extracted format
+- ner: first-page text + BERT NER (skipped when transformers or the model is unavailable)
+and reports pages/s, p50/p95 latency and the peak RSS of the process that ran the document.
+
+Each document runs in its own process, so peak RSS is per document.
+
+Usage:
+    python -m benchmarks.run --repeat 5 --output artifacts/benchmarks/latest.json
+    python -m benchmarks.run --save-baseline                  # record benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.10
+The run exits with status 1 when a measurement regresses by more than the threshold.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.synthetic import ensure_documents
+from src.instrumentation import peak_rss_mb
+
+SYNTHETIC_SIZES = [50, 200, 1000]
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+DEFAULT_OUTPUT = os.path.join("artifacts", "benchmarks", "latest.json")
+MIN_COMPARED_SECONDS = 0.005  # Faster latencies are timer noise and are not compared
+
+# Template checked by the compliance benchmark (the app's default inputs)
+TEMPLATE = {
+    "table_of_contents": {"toc_present": True, "heading_font_size": 16, "subheading_font_size": 14},
+    "list_of_figures": {"lof_present": True, "figure_caption_font_size": 12},
+    "abbreviations_section": {"abbreviations_section_present": True, "abbreviations_sorted": "asc"},
+    "font_type_size": {"body_font_type": "Times New Roman", "body_font_size": 12, "heading_font_type": "Arial", "heading_font_size": 16},
+    "margins": {"left_margin_inch": 1.0, "right_margin_inch": 1.0, "top_margin_inch": 1.0, "bottom_margin_inch": 1.0},
+    "text_alignment": {"text_alignment": "Justified"},
+    "figure_placement": {"figure_placement": "center", "figure_caption_position": "below", "figure_caption_font_size": 12},
+    "table_placement": {"table_placement": "center", "table_caption_position": "above", "table_caption_font_size": 12},
+    "references_formatting": {"references_format": "IEEE", "citations_consistent": True},
+}
+
+
+def percentile(values, fraction):
+    """Linear-interpolated percentile of a non-empty list."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies, pages=None):
+    p50 = percentile(latencies, 0.5)
+    summary = {
+        "runs": len(latencies),
+        "p50_seconds": round(p50, 6),
+        "p95_seconds": round(percentile(latencies, 0.95), 6),
+    }
+    if pages is not None:
+        summary["pages_per_second"] = round(pages / p50, 2) if p50 > 0 else None
+    return summary
+
+
+def benchmark_document(pdf_path, repeat, run_ner):
+    """
+    Runs in a fresh process: time every benchmarked path on one document.
+    Failures are returned as {"error": ...}, since CustomException does not survive unpickling.
+    """
+    try:
+        return _benchmark_document(pdf_path, repeat, run_ner)
+    except Exception as e:
+        return {"document": os.path.basename(pdf_path), "error": str(e), "peak_rss_mb": peak_rss_mb()}
+
+
+def _benchmark_document(pdf_path, repeat, run_ner):
+    import fitz
+    from src.components.extraction.format_extractor import FormatExtractor
+    from src.components.extraction.format_verifier import generate_formatting_compliance_report
+
+    with fitz.open(pdf_path) as doc:
+        pages = len(doc) - 1  # The cover page is skipped by the format extractor
+
+    result = {"document": os.path.basename(pdf_path), "pages": pages}
+
+    format_latencies, compliance_latencies = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extracted_format = FormatExtractor(pdf_path).extract_all()
+        format_latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        generate_formatting_compliance_report(TEMPLATE, extracted_format)
+        compliance_latencies.append(time.perf_counter() - start)
+    result["format"] = summarize(format_latencies, pages)
+    result["compliance"] = summarize(compliance_latencies)  # Works on the extracted dict, not on pages
+
+    if run_ner:
+        result["ner"] = benchmark_ner(pdf_path, repeat)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def benchmark_ner(pdf_path, repeat):
+    try:
+        from src.pipelines.metadata_extraction_pipeline import MetadataExtractionPipeline
+        from src.pipelines.utils import clean_pdf_text, extract_first_page_text
+        pipeline = MetadataExtractionPipeline()
+        start = time.perf_counter()
+        pipeline.ner_pipeline  # Loads the model
+        load_seconds = time.perf_counter() - start
+    except Exception as e:
+        return {"skipped": str(e).splitlines()[-1][:200]}
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        # The BERT half of the metadata path as served: cover page text, batched NER and post-processing
+        pipeline.bert_metadata_batch([clean_pdf_text(extract_first_page_text(pdf_path))])
+        latencies.append(time.perf_counter() - start)
+    summary = summarize(latencies)  # The metadata path reads only the cover page
+    summary["model_load_seconds"] = round(load_seconds, 3)
+    return summary
+
+
+def run_benchmarks(pdf_paths, repeat, run_ner):
+    # A fresh process per document, so peak RSS and warm caches do not leak between documents
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for pdf_path in pdf_paths:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(benchmark_document, pdf_path, repeat, run_ner).result()
+        print(format_result(result), flush=True)
+        results.append(result)
+    return results
+
+
+def format_result(result):
+    if "error" in result:
+        return f"{result['document']:<28}failed: {result['error'][-120:]}"
+    line = (f"{result['document']:<28}{result['pages']:>6} pages  "
+            f"format p50 {result['format']['p50_seconds']:>8.3f}s  p95 {result['format']['p95_seconds']:>8.3f}s  "
+            f"{result['format']['pages_per_second'] or 0:>8.1f} pages/s  rss {result['peak_rss_mb']:>7.1f} MiB")
+    if "p50_seconds" in result.get("ner", {}):
+        line += f"  ner p50 {result['ner']['p50_seconds']:.3f}s"
+    return line
+
+
+def compare(results, baseline, threshold):
+    """
+    List the measurements that regressed by more than `threshold` (a fraction) against the baseline.
+    Latencies and RSS regress when they grow, throughput when it drops.
+    """
+    baseline_by_document = {result["document"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline_by_document.get(result["document"])
+        if previous is None:
+            continue
+        if "error" in result or "error" in previous:
+            continue
+        checks = [("peak_rss_mb", result.get("peak_rss_mb"), previous.get("peak_rss_mb"), True)]
+        for path in ("format", "compliance", "ner"):
+            current, before = result.get(path, {}), previous.get(path, {})
+            checks.append((f"{path}.p50_seconds", current.get("p50_seconds"), before.get("p50_seconds"), True))
+            checks.append((f"{path}.p95_seconds", current.get("p95_seconds"), before.get("p95_seconds"), True))
+            checks.append((f"{path}.pages_per_second", current.get("pages_per_second"), before.get("pages_per_second"), False))
+
+        for metric, value, reference, lower_is_better in checks:
+            if not value or not reference:
+                continue
+            if metric.endswith("_seconds") and reference < MIN_COMPARED_SECONDS:
+                continue
+            change = (value - reference) / reference
+            if (change > threshold) if lower_is_better else (-change > threshold):
+                regressions.append({"document": result["document"], "metric": metric,
+                                    "baseline": reference, "current": value, "change": round(change, 3)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", help="PDFs to benchmark (default: dataset/pdfs/*.pdf)")
+    parser.add_argument("--synthetic", nargs="*", type=int, default=SYNTHETIC_SIZES, help="Synthetic page counts")
+    parser.add_argument("--synthetic-dir", default=os.path.join("artifacts", "benchmarks", "synthetic"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-ner", action="store_true")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed regression, e.g. 0.10 for 10%%")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    pdf_paths = args.pdfs or sorted(glob.glob(os.path.join("dataset", "pdfs", "*.pdf")))
+    pdf_paths += ensure_documents(args.synthetic, args.synthetic_dir)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "repeat": args.repeat,
+        "results": run_benchmarks(pdf_paths, args.repeat, not args.skip_ner),
+    }
+
+    output_path = args.baseline if args.save_baseline else args.output
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output_path}")
+
+    if args.save_baseline or not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report["results"], baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression['document']} {regression['metric']}: "
+              f"{regression['baseline']} -> {regression['current']} ({regression['change']:+.1%})")
+    print(f"{len(regressions)} regressions above {args.threshold:.0%} against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Synthetic thesis-like PDFs for benchmarking, built with PyMuPDF.
+
+Every document has a cover page, a Table of Contents, a List of Figures, a list of
+abbreviations, body chapters with figures and tables (each with a caption) and a
+References section, so every extractor has real work to do.
+
+Usage:
+    python -m benchmarks.synthetic 50 200 1000 --output-dir artifacts/benchmarks/synthetic
+"""
+import argparse
+import os
+import fitz
+
+PAGE_WIDTH, PAGE_HEIGHT = fitz.paper_size("a4")
+MARGIN = 72  # 1 inch
+BODY_FONT, HEADING_FONT = "tiro", "tibo"  # Times Roman / Times Bold
+BODY_SIZE, HEADING_SIZE, SUBHEADING_SIZE, CAPTION_SIZE = 12, 16, 14, 10
+TABLE_ROWS, TABLE_COLUMNS = 5, 4
+SYNTHETIC_VERSION = "2"  # Bump when the layout changes, so documents built by an older version are rebuilt
+
+LOREM = (
+    "Document format verification checks that a report follows the margins, fonts and "
+    "section layout required by the submission guidelines of the department. "
+)
+ABBREVIATIONS = [
+    ("API", "Application Programming Interface"),
+    ("BERT", "Bidirectional Encoder Representations from Transformers"),
+    ("CPU", "Central Processing Unit"),
+    ("NER", "Named Entity Recognition"),
+    ("NLP", "Natural Language Processing"),
+    ("PDF", "Portable Document Format"),
+]
+
+
+def _write(page, y, text, font=BODY_FONT, size=BODY_SIZE):
+    page.insert_text((MARGIN, y), text, fontname=font, fontsize=size)
+    return y + size * 1.6
+
+
+def _paragraph(page, y, lines=6):
+    rect = fitz.Rect(MARGIN, y, PAGE_WIDTH - MARGIN, y + lines * BODY_SIZE * 1.5)
+    page.insert_textbox(rect, LOREM * max(1, lines // 2), fontname=BODY_FONT, fontsize=BODY_SIZE, align=fitz.TEXT_ALIGN_JUSTIFY)
+    return rect.y1 + BODY_SIZE
+
+
+def _table(page, y):
+    """Ruled table: every cell border is drawn, as table detection expects."""
+    row_height = BODY_SIZE * 1.6
+    rect = fitz.Rect(MARGIN, y, PAGE_WIDTH - MARGIN, y + TABLE_ROWS * row_height)
+    column_width = rect.width / TABLE_COLUMNS
+    for row in range(TABLE_ROWS + 1):
+        page.draw_line((rect.x0, rect.y0 + row * row_height), (rect.x1, rect.y0 + row * row_height), width=0.5)
+    for column in range(TABLE_COLUMNS + 1):
+        page.draw_line((rect.x0 + column * column_width, rect.y0), (rect.x0 + column * column_width, rect.y1), width=0.5)
+    for row in range(TABLE_ROWS):
+        cells = [f"Row {row + 1}"] + [str((row + 1) * factor) for factor in (3, 7, 11)]
+        for column, cell in enumerate(cells):
+            page.insert_text((rect.x0 + column * column_width + 4, rect.y0 + (row + 1) * row_height - 5),
+                             cell, fontname=BODY_FONT, fontsize=BODY_SIZE)
+    return rect
+
+
+def _figure_pixmap():
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 48), False)
+    pixmap.set_rect(pixmap.irect, (70, 130, 180))
+    return pixmap
+
+
+def build_document(page_count, path):
+    """Write a synthetic document of `page_count` pages (at least 8) to `path`."""
+    page_count = max(page_count, 8)
+    doc = fitz.open()
+    figure_pixmap = _figure_pixmap()
+    body_pages = page_count - 5  # Cover, ToC, LoF, abbreviations and references take one page each
+    chapters = max(1, body_pages // 10)
+
+    # Cover page (skipped by the format extractor, read by the metadata pipeline)
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    y = _write(page, 200, "Tribhuvan University", HEADING_FONT, HEADING_SIZE)
+    y = _write(page, y, "A Project Report on Synthetic Documents", HEADING_FONT, HEADING_SIZE)
+    y = _write(page, y + 40, "Submitted by: Jane Doe (101), John Roe (102)")
+    y = _write(page, y, "Under the Supervision of Mr. Richard Poe")
+    _write(page, y, "February 2025")
+
+    # Table of Contents
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    y = _write(page, MARGIN + HEADING_SIZE, "Table of Contents", HEADING_FONT, HEADING_SIZE)
+    for chapter in range(1, min(chapters, 20) + 1):
+        y = _write(page, y, f"{chapter} Chapter {chapter} Title", BODY_FONT, SUBHEADING_SIZE)
+        y = _write(page, y, f"{chapter}.1 Section Overview")
+
+    # List of Figures
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    y = _write(page, MARGIN + HEADING_SIZE, "List of Figures", HEADING_FONT, HEADING_SIZE)
+    for figure in range(1, min(chapters, 20) + 1):
+        y = _write(page, y, f"Figure {figure}: Overview of chapter {figure}", BODY_FONT, CAPTION_SIZE)
+
+    # List of Abbreviations
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    y = _write(page, MARGIN + HEADING_SIZE, "List of Abbreviations", HEADING_FONT, HEADING_SIZE)
+    for abbreviation, long_form in ABBREVIATIONS:
+        y = _write(page, y, f"{abbreviation} - {long_form}")
+
+    # Body: every chapter opens with a heading, figures and tables alternate on the following pages
+    for body_page in range(body_pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        y = MARGIN + HEADING_SIZE
+        if body_page % 10 == 0:
+            chapter = body_page // 10 + 1
+            y = _write(page, y, f"Chapter {chapter}", HEADING_FONT, HEADING_SIZE)
+        y = _paragraph(page, y)
+
+        if body_page % 3 == 1:
+            # Centered figure with its caption below
+            figure_rect = fitz.Rect(PAGE_WIDTH / 2 - 120, y, PAGE_WIDTH / 2 + 120, y + 160)
+            page.insert_image(figure_rect, pixmap=figure_pixmap)
+            y = _write(page, figure_rect.y1 + CAPTION_SIZE + 2, f"Figure {body_page}: Synthetic figure", BODY_FONT, CAPTION_SIZE)
+        elif body_page % 3 == 2:
+            # Table caption above, then a ruled grid of rows
+            y = _write(page, y, f"Table {body_page}: Synthetic results", BODY_FONT, CAPTION_SIZE)
+            table_rect = _table(page, y)
+            y = table_rect.y1 + BODY_SIZE
+        _paragraph(page, y, lines=4)
+
+    # References (IEEE style)
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    y = _write(page, MARGIN + HEADING_SIZE, "References", HEADING_FONT, HEADING_SIZE)
+    for reference in range(1, 11):
+        y = _write(page, y, f"[{reference}] A. Author, \"Paper title {reference},\" Journal of Examples, vol. {reference}, 2024.")
+
+    doc.set_metadata({"keywords": f"synthetic-v{SYNTHETIC_VERSION}"})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return path
+
+
+def synthetic_path(page_count, output_dir):
+    return os.path.join(output_dir, f"synthetic_{page_count}.pdf")
+
+
+def _is_current(path):
+    """Whether `path` exists and was built by this version of the layout."""
+    if not os.path.exists(path):
+        return False
+    with fitz.open(path) as doc:
+        return doc.metadata.get("keywords") == f"synthetic-v{SYNTHETIC_VERSION}"
+
+
+def ensure_documents(page_counts, output_dir):
+    """Build (or reuse) one synthetic document per page count and return their paths."""
+    paths = []
+    for page_count in page_counts:
+        path = synthetic_path(page_count, output_dir)
+        if not _is_current(path):
+            build_document(page_count, path)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build synthetic benchmark PDFs.")
+    parser.add_argument("pages", nargs="*", type=int, default=[50, 200, 1000])
+    parser.add_argument("--output-dir", default=os.path.join("artifacts", "benchmarks", "synthetic"))
+    args = parser.parse_args()
+    for page_count in args.pages:
+        print(build_document(page_count, synthetic_path(page_count, args.output_dir)))
+
+
+if __name__ == "__main__":
+    main()
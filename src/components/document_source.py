@@ -0,0 +1,96 @@
+import mmap
+import os
+import sys
+import fitz
+from src.exception import CustomException
+from src.components.result_cache import document_digest
+
+
+class DocumentSource:
+    """
+    One open PDF, shared by every pipeline that works on the same request.
+    The PDF can be a file path, or bytes / bytearray / memoryview / mmap held in memory;
+    in-memory PDFs are handed to MuPDF through a memoryview, so they are never copied
+    or written to a temp file.
+    """
+
+    def __init__(self, pdf):
+        try:
+            if isinstance(pdf, (str, os.PathLike)):
+                self.path = os.fspath(pdf)
+                self.data = None
+            elif isinstance(pdf, bytes):
+                self.path = None
+                self.data = pdf
+            elif isinstance(pdf, (bytearray, memoryview, mmap.mmap)):
+                self.path = None
+                self.data = memoryview(pdf)  # fitz.open copies a bytearray, but keeps a memoryview as is
+            else:
+                raise TypeError(f"Unsupported PDF source: {type(pdf).__name__}")
+            self._doc = None
+            self._digest = None
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @property
+    def doc(self) -> fitz.Document:
+        # Opened on first use, so cached results never parse the PDF
+        if self._doc is None:
+            if self.data is not None:
+                self._doc = fitz.open(stream=self.data, filetype="pdf")
+            else:
+                self._doc = fitz.open(self.path)
+        return self._doc
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the PDF, computed once and shared by the result caches of all pipelines."""
+        if self._digest is None:
+            self._digest = document_digest(self.data if self.data is not None else self.path)
+        return self._digest
+
+    def worker_source(self):
+        """What a process-pool worker needs to open its own handle: the path, or the raw bytes."""
+        return self.path if self.path is not None else bytes(self.data)
+
+    def pages(self, skip=0):
+        """Logical view of the document without its first `skip` pages (e.g. the cover page)."""
+        return PageView(self.doc, skip)
+
+    def close(self):
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+
+class PageView:
+    """
+    Read-only, offset view over the pages of a document.
+    It indexes like a fitz.Document but leaves the document itself untouched,
+    so other readers of the same handle still see every page.
+    """
+
+    def __init__(self, doc, offset=0):
+        self.doc = doc
+        self.offset = min(offset, len(doc))
+
+    def __len__(self):
+        return len(self.doc) - self.offset
+
+    def __getitem__(self, page_num) -> fitz.Page:
+        if page_num < 0:
+            page_num += len(self)
+        if not 0 <= page_num < len(self):
+            raise IndexError(f"page {page_num} not in view of {len(self)} pages")
+        return self.doc[page_num + self.offset]
+
+    def __iter__(self):
+        for page_num in range(len(self)):
+            yield self[page_num]
+
+
+def open_document(pdf) -> DocumentSource:
+    """Return `pdf` itself if it already is a DocumentSource, otherwise open a new one."""
+    if isinstance(pdf, DocumentSource):
+        return pdf
+    return DocumentSource(pdf)
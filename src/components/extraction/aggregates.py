@@ -0,0 +1,77 @@
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+def _empty_margins():
+    return {"left": [], "right": [], "top": [], "bottom": []}
+
+
+@dataclass
+class PageAggregates:
+    """
+    Partial results of the whole-document extractors over a range of pages.
+    Partials computed over consecutive page ranges can be merged in page order,
+    which gives exactly the statistics a single pass over all pages would give.
+    """
+    font_pairs: Counter = field(default_factory=Counter)  # (interned font name, size) -> span count
+    heading_font_size: Optional[int] = None  # Largest font size seen so far
+    margins: dict = field(default_factory=_empty_margins)  # Per-page margins (inches), in page order
+    alignments: Counter = field(default_factory=Counter)
+    figure_placements: Counter = field(default_factory=Counter)
+    figure_caption_positions: Counter = field(default_factory=Counter)
+    figure_caption_font_sizes: Counter = field(default_factory=Counter)
+    table_placements: Counter = field(default_factory=Counter)
+    table_caption_positions: Counter = field(default_factory=Counter)
+    table_caption_font_sizes: Counter = field(default_factory=Counter)
+
+    def add_font(self, font_type, font_size):
+        self.font_pairs[(sys.intern(font_type), font_size)] += 1
+        if self.heading_font_size is None or font_size > self.heading_font_size:
+            self.heading_font_size = font_size
+
+    # The font statistics below are derived from font_pairs. Pairs are kept in first-seen
+    # order, so every derived Counter also lists its keys in first-seen order and
+    # most_common() breaks ties exactly as it would on per-span lists.
+    @property
+    def font_types(self) -> Counter:
+        font_types = Counter()
+        for (font_type, _), count in self.font_pairs.items():
+            font_types[font_type] += count
+        return font_types
+
+    @property
+    def font_sizes(self) -> Counter:
+        font_sizes = Counter()
+        for (_, font_size), count in self.font_pairs.items():
+            font_sizes[font_size] += count
+        return font_sizes
+
+    @property
+    def heading_fonts(self) -> Counter:
+        """Fonts used at heading_font_size."""
+        heading_fonts = Counter()
+        for (font_type, font_size), count in self.font_pairs.items():
+            if font_size == self.heading_font_size:
+                heading_fonts[font_type] += count
+        return heading_fonts
+
+    def merge(self, other):
+        """Merge the partial of the *following* page range into this one."""
+        self.font_pairs.update(other.font_pairs)
+        if other.heading_font_size is not None:
+            if self.heading_font_size is None or other.heading_font_size > self.heading_font_size:
+                self.heading_font_size = other.heading_font_size
+
+        for side, values in other.margins.items():
+            self.margins[side].extend(values)
+
+        self.alignments.update(other.alignments)
+        self.figure_placements.update(other.figure_placements)
+        self.figure_caption_positions.update(other.figure_caption_positions)
+        self.figure_caption_font_sizes.update(other.figure_caption_font_sizes)
+        self.table_placements.update(other.table_placements)
+        self.table_caption_positions.update(other.table_caption_positions)
+        self.table_caption_font_sizes.update(other.table_caption_font_sizes)
+        return self
@@ -3,226 +3,374 @@ import fitz
 from src.exception import CustomException
 from src.logger import logging
 import re
+import math
 from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 import json
+import numpy as np
+from src.components.extraction.aggregates import PageAggregates
+from src.components.extraction.front_matter import FRONT_MATTER_SCANNERS, check_sorting_order, scan_front_matter
+from src.components.extraction.layout import DocumentLayout
+from src.components.extraction.sampling import SAMPLED_SECTIONS, page_statistics, section_confidence, stratified_rounds
+from src.components.document_source import open_document
+from src.instrumentation import Instrumentation, peak_rss_mb
+
+# Bump whenever extraction logic changes, so cached results of older versions are not reused
+FORMAT_EXTRACTOR_VERSION = "4"
+
+# Output section -> extractor producing it, in extract_all order
+SECTION_EXTRACTORS = {
+    "table_of_contents": "table_of_content_extractor",
+    "list_of_figures": "list_of_figures_extractor",
+    "abbreviations_section": "abbreviations_extractor",
+    "font_type_size": "font_data_extractor",
+    "margins": "margin_data_extractor",
+    "text_alignment": "text_alignment_extractor",
+    "figure_placement": "figure_data_extractor",
+    "table_placement": "table_data_extractor",
+    "references_formatting": "references_extractor",
+}
+
+# References section patterns
+REFERENCES_HEADING = re.compile(r"\b(References|Bibliography|Works Cited)\b", re.IGNORECASE)
+REFERENCES_HEADING_LINE = re.compile(r"^(?:[\dIVX]+\.?\s*)?(References|Bibliography|Works Cited)\s*:?$", re.IGNORECASE)
+REFERENCE_NUMBERED = re.compile(r"^\[?\d+\]?")
+REFERENCE_YEAR = re.compile(r"\(\d{4}\)")
+REFERENCE_AUTHOR = re.compile(r"^\w+\.")
+REFERENCE_IEEE = re.compile(r"^\[\d+\]")
+
+# Block alignment classes, indexed by the codes computed in collect_text_alignment
+ALIGNMENT_LABELS = ("Justified", "Left", "Right", "Mixed")
+
+# Pages between MuPDF store flushes in low-memory mode. 1 gives the flattest memory, but every
+# page then re-loads its fonts (about 4x slower on long text-only documents)
+LOW_MEMORY_SHRINK_INTERVAL = 8
+
+# Sections computed from per-page statistics over the whole document -> reducer of their aggregates
+AGGREGATE_SECTIONS = {
+    "font_type_size": "font_data_result",
+    "margins": "margin_data_result",
+    "text_alignment": "text_alignment_result",
+    "figure_placement": "figure_data_result",
+    "table_placement": "table_data_result",
+}
 
 class FormatExtractor:
-    def __init__(self, pdf_path):
-        self.pdf_path = pdf_path
-        self.doc = fitz.open(pdf_path)
-        self.doc.delete_page(0)
+    def __init__(self, pdf, workers=1, cache=None, sampling=None, low_memory=False):
+        self.source = open_document(pdf)  # Path, in-memory bytes or a DocumentSource shared with other pipelines
+        self.workers = workers  # > 1 spreads the whole-document extractors over a process pool
+        self.cache = cache  # Optional ResultCache; a hit never opens the PDF
+        self.sampling = sampling  # Optional SamplingConfig: estimate fonts/margins/alignment from a page sample
+        self.low_memory = low_memory  # Page-at-a-time extraction with flat memory, for very large PDFs
+        self.instrumentation = Instrumentation()  # Per-document stage timings and counters
+        self._doc = None
+        self._layout = None
+
+    @property
+    def doc(self):
+        # Opened on first use, so cached results skip fitz.open entirely.
+        # The cover page is skipped through a page view; the shared document is not modified.
+        if self._doc is None:
+            self._doc = self.source.pages(skip=1)
+        return self._doc
+
+    @property
+    def layout(self):
+        if self._layout is None:
+            # Each page is parsed once and shared by every extractor; in low-memory mode only the current page is kept
+            self._layout = DocumentLayout(self.doc, max_cached_pages=1 if self.low_memory else None)
+        return self._layout
+
+    @property
+    def cache_namespace(self):
+        namespace = f"format_extractor-v{FORMAT_EXTRACTOR_VERSION}"
+        if self.sampling is not None:
+            namespace += (f"-sampled-{self.sampling.strata}-{self.sampling.min_rounds}"
+                          f"-{self.sampling.target_confidence}-{self.sampling.seed}")
+        return namespace
     
     def get_doc(self):
         return self.doc
     
-    def extract_all(self):
+    def extract_all(self, return_metrics=False):
+        return self.extract(return_metrics=return_metrics)
+
+    def extract(self, sections=None, return_metrics=False):
+        """
+        Extract only the requested sections (keys of the extract_all output); all of them when None.
+        Pages are parsed lazily, so only the pages the selected extractors read are parsed,
+        e.g. the first 10-15 pages for ToC/LoF/abbreviations.
+        With return_metrics, returns (results, metrics) where metrics is the dict of metrics().
+        """
+        # Merge all sections into one dic
+        extracted = dict(self.iter_extract(sections))
+        if return_metrics:
+            return extracted, self.metrics()
+        return extracted
+
+    @contextmanager
+    def measure(self, stage):
+        """Time a stage and record the layout pages it visited and their spans."""
+        with self.instrumentation.stage(stage) as record:
+            if self._layout is not None:
+                self._layout.visited.clear()
+            yield record
+            if self._layout is not None:
+                record.pages += len(self._layout.visited)
+                record.spans += sum(self._layout.visited.values())
+
+    def metrics(self):
+        """Per-document metrics: stage timings and counters, including MuPDF parses and get_text calls, and peak RSS."""
+        self.instrumentation.gauge("peak_rss_mb", peak_rss_mb())
+        metrics = self.instrumentation.to_dict()
+        if self._layout is not None:
+            counters = metrics["counters"]
+            counters["page_parses"] = counters.get("page_parses", 0) + self._layout.parse_count
+            counters["get_text_calls"] = counters.get("get_text_calls", 0) + self._layout.get_text_calls
+            counters["get_drawings_calls"] = counters.get("get_drawings_calls", 0) + self._layout.get_drawings_calls
+            counters["get_image_info_calls"] = counters.get("get_image_info_calls", 0) + self._layout.get_image_info_calls
+        return metrics
+
+    def iter_extract(self, sections=None):
+        """
+        Yield (section_name, result) pairs as each extractor finishes.
+        Cheap front-matter sections (ToC, LoF, abbreviations) come first,
+        whole-document ones (fonts, margins, ..., references) later.
+        In sampling mode a final "sampling_confidence" pair reports, for each sampled section,
+        a bootstrap confidence of the estimate and the number of pages visited.
+        """
         try:
-            # Extract formatting information from the document
-            toc_e = self.table_of_content_extractor(self.doc)
-            lof_e = self.list_of_figures_extractor(self.doc)
-            abbreviations_e = self.abbreviations_extractor(self.doc)
-            font_e = self.font_data_extractor(self.doc)
-            margin_e = self.margin_data_extractor(self.doc)
-            alignment_e = self.text_alignment_extractor(self.doc)
-            figure_e = self.figure_data_extractor(self.doc)
-            table_e = self.table_data_extractor(self.doc)
-            references_e = self.references_extractor(self.doc)
-
-            # Merge all dic into one
-            return {
-                **toc_e,
-                **lof_e,
-                **abbreviations_e,
-                **font_e,
-                **margin_e,
-                **alignment_e,
-                **figure_e,
-                **table_e,
-                **references_e,
-            }
-        except CustomException as e:
+            requested = self.resolve_sections(sections)
+
+            # Sections already extracted for this exact PDF content
+            cached, digest = {}, None
+            if self.cache is not None:
+                with self.measure("cache_lookup"):
+                    digest = self.source.digest
+                    cached = self.cache.get(self.cache_namespace, digest) or {}
+                self.instrumentation.count("cached_sections", len([section for section in requested if section in cached]))
+            missing = [section for section in requested if section not in cached]
+
+            front_matter_sections = [section for section in missing if section in FRONT_MATTER_SCANNERS]
+            sampled_sections = [section for section in missing if self.sampling is not None and section in SAMPLED_SECTIONS]
+            aggregate_sections = [section for section in missing if section in AGGREGATE_SECTIONS and section not in sampled_sections]
+            front_matter = None
+            sampled = None
+            aggregates = None
+            extracted_sections = {}
+
+            for section in requested:
+                if section in cached:
+                    yield section, cached[section]
+                    continue
+                if section in FRONT_MATTER_SCANNERS:
+                    # ToC, LoF and abbreviations share one bounded pass over the first pages
+                    if front_matter is None:
+                        with self.measure("scan_front_matter"):
+                            front_matter = scan_front_matter(self.layout, front_matter_sections)
+                    extracted_sections[section] = front_matter[section]
+                elif section in sampled_sections:
+                    # Fonts, margins and alignment are estimated from one shared page sample
+                    if sampled is None:
+                        with self.measure("sampled_page_aggregates"):
+                            sampled = self.sampled_page_aggregates(sampled_sections)
+                    extracted_sections[section] = getattr(self, AGGREGATE_SECTIONS[section])(sampled[0])[section]
+                elif self.low_memory and section in AGGREGATE_SECTIONS:
+                    # Whole-document sections share one page-at-a-time pass
+                    if aggregates is None:
+                        with self.measure("low_memory_page_aggregates"):
+                            aggregates = self.low_memory_page_aggregates(aggregate_sections)
+                    extracted_sections[section] = getattr(self, AGGREGATE_SECTIONS[section])(aggregates)[section]
+                elif self.workers > 1 and section in AGGREGATE_SECTIONS:
+                    # Whole-document sections share one pass over the pages on the process pool
+                    if aggregates is None:
+                        with self.measure("parallel_page_aggregates"):
+                            aggregates = self.parallel_page_aggregates(aggregate_sections)
+                    extracted_sections[section] = getattr(self, AGGREGATE_SECTIONS[section])(aggregates)[section]
+                else:
+                    with self.measure(SECTION_EXTRACTORS[section]):
+                        extracted_sections[section] = getattr(self, SECTION_EXTRACTORS[section])(self.layout)[section]
+                yield section, extracted_sections[section]
+
+            if self.sampling is not None and any(section in SAMPLED_SECTIONS for section in requested):
+                sampling_confidence = dict(cached.get("sampling_confidence", {}))
+                if sampled is not None:
+                    sampling_confidence.update(sampled[1])
+                    extracted_sections["sampling_confidence"] = sampling_confidence
+                yield "sampling_confidence", {
+                    section: report for section, report in sampling_confidence.items() if section in requested
+                }
+
+            if self.cache is not None and extracted_sections:
+                with self.measure("cache_store"):
+                    self.cache.put(self.cache_namespace, digest, {**cached, **extracted_sections})
+        except Exception as e:
             raise CustomException(e,sys)
-    
-    def table_of_content_extractor(self,doc):
-        toc_text = ""
-        toc_found = False  # Flag to track if ToC has started
-        potential_toc = []  # Store potential ToC lines
-        toc_fonts = []  # Store font size information
-        toc_heading_size = None  # Track ToC heading font size (only once)
-        subheading_sizes = set()  # Track unique subheading font sizes
 
-        # Iterate through first few pages (ToC is usually at the beginning)
-        for page_num in range(min(10, len(doc))):  # Scan first 10 pages
-            text_blocks = doc[page_num].get_text("dict")["blocks"]
-
-            for block in text_blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            font_size = round(span["size"])  # Extract font size
-                            line_text = span["text"].strip()
-
-                            # Detect ToC heading (ensure we only capture the first occurrence)
-                            if re.search(r"\b(Table\s*of\s*Contents|Contents|Index)\b", line_text, re.IGNORECASE):
-                                if not toc_found:  # Only set once
-                                    toc_found = True  
-                                    toc_heading_size = font_size  # Store only the first ToC heading font size
-                                    toc_fonts.append(("Heading", line_text, font_size))
-                                toc_text += line_text + "\n"
-                                continue
-
-                            # If ToC has started, keep extracting until a matching font size is detected
-                            if toc_found:
-                                # Stop when encountering a section heading of the same size as the ToC heading
-                                if font_size == toc_heading_size:
-                                    return {
-                                        "table_of_contents": {
-                                            "toc_present": True,
-                                            "heading_font_size": toc_heading_size,
-                                            "subheading_font_size": max(subheading_sizes) if subheading_sizes else None
-                                        }
-                                    }
-
-                                # Identify ToC subheadings based on detected text patterns
-                                if re.match(r"^\d+(\.\d+)*\s+[A-Za-z\s]+", line_text):  
-                                    subheading_sizes.add(font_size)  # Store unique subheading font sizes
-                                    toc_fonts.append(("Subheading", line_text, font_size))
-                                else:
-                                    toc_fonts.append(("Regular", line_text, font_size))
-
-                                potential_toc.append(line_text)
-                                toc_text += line_text + "\n"
-
-        # If no ToC found, return False
-        return {
-            "table_of_contents": {
-                "toc_present": False,
-                "heading_font_size": None,
-                "subheading_font_size": None
+    def resolve_sections(self, sections=None):
+        """Validate the requested sections and return them in extraction order."""
+        if sections is None:
+            return list(SECTION_EXTRACTORS)
+        unknown = set(sections) - set(SECTION_EXTRACTORS)
+        if unknown:
+            raise ValueError(f"Unknown format sections: {sorted(unknown)}")
+        return [section for section in SECTION_EXTRACTORS if section in sections]
+
+    def collect_page_aggregates(self, page_numbers, sections=AGGREGATE_SECTIONS):
+        """Collect the whole-document statistics of the given pages in a single pass."""
+        aggregates = PageAggregates()
+        page_width = self.doc[0].rect.width  # Width of the first page, used for figure/table alignment
+
+        page_numbers = list(page_numbers)
+        # Margins and alignment are vectorized over all the pages at once
+        if "margins" in sections:
+            self.collect_margin_data(self.layout, page_numbers, aggregates)
+        if "text_alignment" in sections:
+            self.collect_text_alignment(self.layout, page_numbers, aggregates)
+
+        for page_num in page_numbers:
+            page = self.layout[page_num]
+            if "font_type_size" in sections:
+                self.collect_font_data(page, aggregates)
+            if "figure_placement" in sections:
+                self.collect_figure_data(self.layout, page_num, page_width, aggregates)
+            if "table_placement" in sections:
+                self.collect_table_data(self.layout, page_num, page_width, aggregates)
+
+        return aggregates
+
+    def sampled_page_aggregates(self, sections):
+        """
+        Estimate whole-document statistics from a stratified sample of pages.
+        Each round adds one unvisited page per stratum. After `min_rounds` rounds, sampling stops
+        once every section's estimable confidence (see sampling.section_confidence) reaches
+        `target_confidence`, or when every page has been visited.
+        The confidences are computed on the unrounded statistics (per-page means and counts),
+        since the rounded outputs look stable long before the estimate is.
+        Returns (aggregates, {section: sampling report}).
+        """
+        page_count = len(self.doc)
+        partials = {}
+        page_stats = []  # page_statistics() of the sampled pages
+        confidences = {}
+        next_test = 0  # Sample size of the next stopping test
+
+        def merge_pages(page_partials):
+            # Merge in page order, so ties resolve as they would in a full pass
+            aggregates = PageAggregates()
+            for partial in page_partials:
+                aggregates.merge(partial)
+            return aggregates
+
+        for rounds, round_pages in enumerate(stratified_rounds(page_count, self.sampling), start=1):
+            for page_num in round_pages:
+                partials[page_num] = self.collect_page_aggregates([page_num], sections)
+                page_stats.append(page_statistics(partials[page_num]))
+
+            # Tested each time the sample grows by a tenth, so the tests stay cheap next to the pages read
+            if rounds < self.sampling.min_rounds or (len(partials) < next_test and len(partials) < page_count):
+                continue
+            next_test = len(partials) * 1.1
+            confidences = {section: section_confidence(section, page_stats, page_count) for section in sections}
+            if all(estimable >= self.sampling.target_confidence for _, estimable in confidences.values()):
+                break
+
+        report = {}
+        for section in sections:
+            report[section] = {
+                "confidence": confidences[section][0],
+                "pages_sampled": len(partials),
+                "pages_total": page_count,
             }
-        }
+        logging.info(f"Sampled {len(partials)} of {page_count} pages for {sections}")
+        return merge_pages(partials[page_num] for page_num in sorted(partials)), report
 
-    def list_of_figures_extractor(self,doc):
-        lof_text = ""
-        lof_found = False  # Flag to track if LoF has started
-        figure_caption_sizes = set()  # Store unique font sizes of figure captions
-        lof_heading_size = None  # Track LoF heading font size
+    def low_memory_page_aggregates(self, sections=AGGREGATE_SECTIONS):
+        """
+        Collect the whole-document statistics one page at a time.
+        Only one parsed page is held at once, and MuPDF's object store is emptied every
+        LOW_MEMORY_SHRINK_INTERVAL pages, so memory stays flat as the page count grows.
+        Partials are merged in page order, so the result is identical to a full pass.
+        """
+        aggregates = PageAggregates()
+        for page_num in range(len(self.doc)):
+            aggregates.merge(self.collect_page_aggregates([page_num], sections))
+            if (page_num + 1) % LOW_MEMORY_SHRINK_INTERVAL == 0:
+                fitz.TOOLS.store_shrink(100)  # Drop the decoded fonts, images and content streams held by MuPDF
+        return aggregates
+
+    def parallel_page_aggregates(self, sections=AGGREGATE_SECTIONS):
+        """
+        Split the page range into contiguous chunks and collect them on a process pool.
+        Each worker opens its own handle on the PDF (from its path, or from its bytes
+        for in-memory documents); partials are merged back in page order,
+        so the result is identical to a serial pass.
+        """
+        page_count = len(self.doc)
+        chunk_size = max(1, math.ceil(page_count / (self.workers * 4)))  # A few chunks per worker to balance load
+        page_ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+
+        aggregates = PageAggregates()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.source.worker_source(),)) as executor:
+            futures = [
+                executor.submit(_collect_page_range, start, stop, sections)
+                for start, stop in page_ranges
+            ]
+            for future in futures:
+                partial, worker_metrics = future.result()
+                aggregates.merge(partial)
+                self.instrumentation.merge(worker_metrics)  # Worker CPU time, pages, spans and get_text calls
+
+        logging.info(f"Collected {page_count} pages on {self.workers} workers in {len(page_ranges)} chunks")
+        return aggregates
+    
+    def table_of_content_extractor(self,layout):
+        # Iterate through first few pages (ToC is usually at the beginning)
+        return scan_front_matter(layout, ["table_of_contents"])
 
+    def list_of_figures_extractor(self,layout):
         # Iterate through first few pages (LoF is usually at the beginning)
-        for page_num in range(min(10, len(doc))):  # Scan first 10 pages
-            text_blocks = doc[page_num].get_text("dict")["blocks"]
-
-            for block in text_blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            font_size = round(span["size"])  # Extract font size
-                            line_text = span["text"].strip()
-
-                            # Detect LoF heading (ensuring we only capture the first occurrence)
-                            if re.search(r"\b(List\s*of\s*Figures|Figures|Figure Index)\b", line_text, re.IGNORECASE):
-                                if not lof_found:  # Only set once
-                                    lof_found = True  
-                                    lof_heading_size = font_size  # Store LoF heading font size
-                                lof_text += line_text + "\n"
-                                continue
-
-                            # If LoF has started, keep extracting until a matching font size is detected
-                            if lof_found:
-                                # Identify figure captions (likely smaller font size than heading)
-                                if re.match(r"^(Figure|Fig\.|Table)\s+\d+[:.\s]", line_text):  
-                                    figure_caption_sizes.add(font_size)  # Store caption font size
-
-                                # Stop when encountering a section heading of the same size as the LoF heading,
-                                # BUT only if we have already captured some figure captions.
-                                if font_size == lof_heading_size and figure_caption_sizes:
-                                    return {
-                                        "list_of_figures": {
-                                            "lof_present": True,
-                                            "figure_caption_font_size": max(figure_caption_sizes)  # Return largest detected caption font
-                                        }
-                                    }
-
-                                lof_text += line_text + "\n"
-
-        # If no LoF found, return False
-        return {
-            "list_of_figures": {
-                "lof_present": False,
-                "figure_caption_font_size": None
-            }
-        }
+        return scan_front_matter(layout, ["list_of_figures"])
 
     # Abbreviations Data Extraction
-    def abbreviations_extractor(self,doc):
-        abbreviations = []  # Store extracted abbreviations
-        abbreviations_found = False  # Track if we are in the abbreviations list
-
-        for page_num in range(min(15, len(doc))):  # Scan first 15 pages
-            text_blocks = doc[page_num].get_text("text").split("\n")  # Extract text line by line
-            lines = [line.strip() for line in text_blocks if line.strip()]  # Remove empty lines
-
-            for line in lines:
-                # Detect Abbreviations heading
-                if re.search(r"\b(Abbreviations|List of Abbreviations|Acronyms)\b", line, re.IGNORECASE):
-                    abbreviations_found = True  # Start collecting abbreviations
-                    continue  # Move to the next line
-
-                # If in abbreviations section, extract valid abbreviation-long form pairs
-                if abbreviations_found:
-                    match = re.match(r"^([A-Z0-9]{2,})\s*[-–—:]\s*(.+)$", line)  # Abbreviation - Long form
-                    if match:
-                        abbreviations.append(match.group(1))  # Store the abbreviation
-                    else:
-                        # If a capitalized word appears without a valid format, stop extraction (end of section)
-                        if re.match(r"^[A-Z\s]+$", line) and len(line.split()) <= 5:
-                            break
-
-        # Determine sorting order
-        abbreviations_sorted = self.check_sorting_order(abbreviations)
-        return {
-            "abbreviations_section": {
-                "abbreviations_section_present": True if abbreviations else False,
-                "abbreviations_sorted": abbreviations_sorted
-            }
-        }
+    def abbreviations_extractor(self,layout):
+        return scan_front_matter(layout, ["abbreviations_section"])
 
     def check_sorting_order(self,abbreviations):
         """Determine if abbreviations are sorted in ascending, descending, or no order."""
-        if abbreviations == sorted(abbreviations):
-            return "asc"
-        elif abbreviations == sorted(abbreviations, reverse=True):
-            return "desc"
-        else:
-            return "none"
+        return check_sorting_order(abbreviations)
 
 
     # References Data Extraction
-    def references_extractor(self,doc):
-        references_text = ""
-        references_found = False  # Track if References section is found
+    def references_extractor(self,layout):
         references_list = []  # Store extracted references
         reference_format = None
 
-        for page_num in range(len(doc)):  # Loop through pages
-            text_blocks = doc[page_num].get_text("text").split("\n")  # Extract text line by line
-
-            for line in text_blocks:
-                line = line.strip()
-
-                # Detect References section heading
-                if re.search(r"\b(References|Bibliography|Works Cited)\b", line, re.IGNORECASE):
-                    references_found = True
-                    continue  # Move to the next line
-
-                # If References section is found, collect reference entries
-                if references_found:
-                    if re.match(r"^\[?\d+\]?", line) or re.search(r"\(\d{4}\)", line) or re.match(r"^\w+\.", line):
+        # References sit at the end: find the last References heading scanning backwards,
+        # then parse forward from there only
+        heading = self.find_references_heading(layout)
+        if heading is not None:
+            heading_page, heading_line = heading
+            for page_num in range(heading_page, len(layout)):  # Loop through the remaining pages
+                text_blocks = layout[page_num].text.split("\n")  # Extract text line by line
+                if page_num == heading_page:
+                    text_blocks = text_blocks[heading_line:]
+
+                for line in text_blocks:
+                    line = line.strip()
+
+                    # Skip References section headings
+                    if REFERENCES_HEADING.search(line):
+                        continue  # Move to the next line
+
+                    # Collect reference entries
+                    if REFERENCE_NUMBERED.match(line) or REFERENCE_YEAR.search(line) or REFERENCE_AUTHOR.match(line):
                         references_list.append(line)
 
-                # Stop extraction when encountering a new section (empty line or unrelated text)
-                if references_found and line == "":
-                    break
+                    # Stop extraction when encountering a new section (empty line or unrelated text)
+                    if line == "":
+                        break
 
         # Determine reference format
         reference_format = self.detect_reference_format(references_list)
@@ -237,6 +385,23 @@ class FormatExtractor:
             }
         }
 
+    def find_references_heading(self,layout):
+        """
+        Return (page_num, line_index) of the last References heading, or None.
+        A line that is only the heading (e.g. "REFERENCES", "7. References") wins over a line
+        that merely mentions it (e.g. a ToC entry), so only the last pages are parsed.
+        """
+        fallback = None
+        for page_num in range(len(layout) - 1, -1, -1):  # Loop through pages from the end
+            lines = layout[page_num].text.split("\n")
+            for line_index in range(len(lines) - 1, -1, -1):
+                line = lines[line_index].strip()
+                if REFERENCES_HEADING_LINE.match(line):
+                    return page_num, line_index
+                if fallback is None and REFERENCES_HEADING.search(line):
+                    fallback = (page_num, line_index)
+        return fallback
+
     def detect_reference_format(self,references):
         """
         Detect the reference format: IEEE, APA, or MLA.
@@ -244,42 +409,38 @@ class FormatExtractor:
         formats_detected = []
 
         for ref in references:
-            if re.match(r"^\[\d+\]", ref):  # IEEE format (numbered)
+            if REFERENCE_IEEE.match(ref):  # IEEE format (numbered)
                 formats_detected.append("IEEE")
-            elif re.search(r"\(\d{4}\)", ref):  # APA format (year in parentheses)
+            elif REFERENCE_YEAR.search(ref):  # APA format (year in parentheses)
                 formats_detected.append("APA")
-            elif re.match(r"^\w+\.", ref) and not re.search(r"\(\d{4}\)", ref):  # MLA format (author + title)
+            elif REFERENCE_AUTHOR.match(ref) and not REFERENCE_YEAR.search(ref):  # MLA format (author + title)
                 formats_detected.append("MLA")
 
-        return list(set(formats_detected))  # Return unique formats detected
+        return list(dict.fromkeys(formats_detected))  # Return unique formats detected, in order of first appearance
 
     # Font Data Extraction
-    def font_data_extractor(self,doc):
-        # skip first page from doc
-        font_sizes = []
-        font_types = []
-        heading_fonts = []
-        
-        for page in doc:
-            text_blocks = page.get_text("dict")["blocks"]
-            
-            for block in text_blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            font_size = round(span["size"])  # Extract font size
-                            font_type = span["font"]  # Extract font type
-                            font_sizes.append(font_size)
-                            font_types.append(font_type)
-
+    def font_data_extractor(self,layout):
+        aggregates = PageAggregates()
+        for page in layout:
+            self.collect_font_data(page, aggregates)
+        return self.font_data_result(aggregates)
+
+    def collect_font_data(self,page, aggregates):
+        for block in page.blocks:
+            for line in block.lines:
+                for span in line.spans:
+                    font_size = round(span.size)  # Extract font size
+                    font_type = span.font  # Extract font type
+                    aggregates.add_font(font_type, font_size)
+
+    def font_data_result(self,aggregates):
         # Identify the most common font type & size for body text
-        most_common_body_font = self.most_frequent(font_types)
-        most_common_body_size = self.most_frequent(font_sizes)
+        most_common_body_font = self.most_frequent(aggregates.font_types)
+        most_common_body_size = self.most_frequent(aggregates.font_sizes)
 
         # Identify the most common font & size for headings (largest text)
-        max_font_size = max(font_sizes) if font_sizes else None
-        heading_fonts = [font for font, size in zip(font_types, font_sizes) if size == max_font_size]
-        most_common_heading_font = self.most_frequent(heading_fonts)
+        max_font_size = aggregates.heading_font_size
+        most_common_heading_font = self.most_frequent(aggregates.heading_fonts)
 
         return {
             "font_type_size": {
@@ -291,38 +452,43 @@ class FormatExtractor:
         }
 
     # Margin Data Extraction
-    def margin_data_extractor(self,doc):
-        margin_values = {"left": [], "right": [], "top": [], "bottom": []}
-
-        for page in doc:
-            page_width, page_height = page.rect.width, page.rect.height  # Page size in points
-            text_blocks = page.get_text("dict")["blocks"]
-
-            # Initialize extreme values for text placement
-            leftmost = page_width
-            rightmost = 0
-            topmost = page_height
-            bottommost = 0
-
-            for block in text_blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        x0, y0, x1, y1 = line["bbox"]  # Bounding box (left, top, right, bottom)
-                        leftmost = min(leftmost, x0)
-                        rightmost = max(rightmost, x1)
-                        topmost = min(topmost, y0)
-                        bottommost = max(bottommost, y1)
-
-            # Calculate margins in inches (1 inch = 72 points)
-            left_margin = round(leftmost / 72, 2)
-            right_margin = round((page_width - rightmost) / 72, 2)
-            top_margin = round(topmost / 72, 2)
-            bottom_margin = round((page_height - bottommost) / 72, 2)
-
-            margin_values["left"].append(left_margin)
-            margin_values["right"].append(right_margin)
-            margin_values["top"].append(top_margin)
-            margin_values["bottom"].append(bottom_margin)
+    def margin_data_extractor(self,layout):
+        aggregates = PageAggregates()
+        self.collect_margin_data(layout, range(len(layout)), aggregates)
+        return self.margin_data_result(aggregates)
+
+    def collect_margin_data(self,layout, page_numbers, aggregates):
+        """Per-page text extremes as vectorized min/max reductions over the pages' line bboxes."""
+        page_numbers = list(page_numbers)
+        pages = [layout[page_num] for page_num in page_numbers]
+        lines = layout.line_array(page_numbers)
+        page_width = np.array([page.width for page in pages], dtype=np.float64)  # Page size in points
+        page_height = np.array([page.height for page in pages], dtype=np.float64)
+
+        # Initialize extreme values for text placement
+        leftmost = page_width.copy()
+        rightmost = np.zeros(len(pages))
+        topmost = page_height.copy()
+        bottommost = np.zeros(len(pages))
+
+        if len(lines.bboxes):
+            # Lines are grouped by page, so each page is one contiguous segment
+            starts = np.flatnonzero(np.r_[True, lines.page_ids[1:] != lines.page_ids[:-1]])
+            with_text = lines.page_ids[starts]
+            x0, y0, x1, y1 = lines.bboxes.T  # Bounding box (left, top, right, bottom)
+            leftmost[with_text] = np.minimum(leftmost[with_text], np.minimum.reduceat(x0, starts))
+            rightmost[with_text] = np.maximum(rightmost[with_text], np.maximum.reduceat(x1, starts))
+            topmost[with_text] = np.minimum(topmost[with_text], np.minimum.reduceat(y0, starts))
+            bottommost[with_text] = np.maximum(bottommost[with_text], np.maximum.reduceat(y1, starts))
+
+        # Calculate margins in inches (1 inch = 72 points), rounded with Python's round() as before
+        aggregates.margins["left"].extend(round(value, 2) for value in (leftmost / 72).tolist())
+        aggregates.margins["right"].extend(round(value, 2) for value in ((page_width - rightmost) / 72).tolist())
+        aggregates.margins["top"].extend(round(value, 2) for value in (topmost / 72).tolist())
+        aggregates.margins["bottom"].extend(round(value, 2) for value in ((page_height - bottommost) / 72).tolist())
+
+    def margin_data_result(self,aggregates):
+        margin_values = aggregates.margins
 
         # Compute average margins across pages
         avg_left_margin = round(sum(margin_values["left"]) / len(margin_values["left"]), 2)
@@ -340,38 +506,41 @@ class FormatExtractor:
         }
 
     # Text Alignment Extraction
-    def text_alignment_extractor(self,doc):
-        alignment_counts = []  # Store detected alignments
-
-        for page_num in range(len(doc)):  # Loop through all pages
-            page = doc[page_num]
-            text_blocks = page.get_text("dict")["blocks"]
-
-            for block in text_blocks:
-                if "lines" in block:
-                    left_margins = []
-                    right_margins = []
-
-                    for line in block["lines"]:
-                        x0, _, x1, _ = line["bbox"]  # Get left & right positions of the line
-                        left_margins.append(x0)
-                        right_margins.append(x1)
-
-                    # Compute alignment by analyzing variation in margins
-                    left_variation = max(left_margins) - min(left_margins) if left_margins else 0
-                    right_variation = max(right_margins) - min(right_margins) if right_margins else 0
-
-                    if left_variation < 5 and right_variation < 5:
-                        alignment_counts.append("Justified")
-                    elif left_variation < 5:
-                        alignment_counts.append("Left")
-                    elif right_variation < 5:
-                        alignment_counts.append("Right")
-                    else:
-                        alignment_counts.append("Mixed")
-
+    def text_alignment_extractor(self,layout):
+        aggregates = PageAggregates()
+        self.collect_text_alignment(layout, range(len(layout)), aggregates)  # Loop through all pages
+        return self.text_alignment_result(aggregates)
+
+    def collect_text_alignment(self,layout, page_numbers, aggregates):
+        """Classify every text block from vectorized per-block reductions of its line bboxes."""
+        lines = layout.line_array(page_numbers)
+
+        # Blocks without lines have no variation, i.e. they count as Justified
+        alignment_codes = np.zeros(lines.block_count, dtype=np.int64)
+
+        if len(lines.bboxes):
+            # Lines are grouped by block, so each block is one contiguous segment
+            starts = np.flatnonzero(np.r_[True, lines.block_ids[1:] != lines.block_ids[:-1]])
+            x0, x1 = lines.bboxes[:, 0], lines.bboxes[:, 2]  # Left & right positions of the lines
+
+            # Compute alignment by analyzing variation in margins
+            left_variation = np.maximum.reduceat(x0, starts) - np.minimum.reduceat(x0, starts)
+            right_variation = np.maximum.reduceat(x1, starts) - np.minimum.reduceat(x1, starts)
+            left_aligned = left_variation < 5
+            right_aligned = right_variation < 5
+
+            alignment_codes[lines.block_ids[starts]] = np.select(
+                [left_aligned & right_aligned, left_aligned, right_aligned], [0, 1, 2], default=3
+            )
+
+        # Count detected alignments, inserting labels in order of first appearance like a block-by-block pass
+        codes, first_seen, counts = np.unique(alignment_codes, return_index=True, return_counts=True)
+        for position in np.argsort(first_seen, kind="stable"):
+            aggregates.alignments[ALIGNMENT_LABELS[codes[position]]] += int(counts[position])
+
+    def text_alignment_result(self,aggregates):
         # Determine most frequent text alignment
-        most_common_alignment = self.most_frequent(alignment_counts)
+        most_common_alignment = self.most_frequent(aggregates.alignments)
 
         return {
             "text_alignment": {
@@ -380,49 +549,47 @@ class FormatExtractor:
         }
 
     # Figure Data Extraction
-    def figure_data_extractor(self,doc):
-        page_width = doc[0].rect.width  # Get the width of the first page for alignment checks
-
-        figure_placements = []  # Store placement data
-        caption_positions = []  # Store caption positions
-        caption_font_sizes = []  # Store caption font sizes
-
-        for page_num in range(len(doc)):  # Loop through all pages
-            page = doc[page_num]
-            images = page.get_images(full=True)  # Extract all images (figures)
-
-            for img_index, img in enumerate(images):
-                xref = img[0]  # Get image reference
-                bbox = page.get_image_rects(xref)[0]  # Get bounding box of image (figure)
-
-                # Determine figure alignment
-                fig_x0, fig_y0, fig_x1, fig_y1 = bbox
-                fig_width = fig_x1 - fig_x0
-                page_center_x = page_width / 2
-
-                if abs((fig_x0 + fig_x1) / 2 - page_center_x) < fig_width * 0.1:
-                    placement = "center"
-                elif fig_x0 < page_width * 0.3:
-                    placement = "left"
-                else:
-                    placement = "right"
+    def figure_data_extractor(self,layout):
+        page_width = layout.doc[0].rect.width  # Get the width of the first page for alignment checks
+
+        aggregates = PageAggregates()
+        for page_num in range(len(layout)):  # Loop through all pages
+            self.collect_figure_data(layout, page_num, page_width, aggregates)
+        return self.figure_data_result(aggregates)
 
-                # Find figure caption (text near the figure)
-                figure_caption, caption_font_size, caption_position = self.find_figure_caption(page, bbox)
+    def collect_figure_data(self,layout, page_num, page_width, aggregates):
+        images = layout.image_bboxes(page_num)  # Bounding box of every image (figure), one pass per page
 
-                if caption_font_size:
-                    caption_font_sizes.append(caption_font_size)
+        for bbox in images:
+            # Determine figure alignment
+            fig_x0, fig_y0, fig_x1, fig_y1 = bbox
+            fig_width = fig_x1 - fig_x0
+            page_center_x = page_width / 2
 
-                if placement:
-                    figure_placements.append(placement)
+            if abs((fig_x0 + fig_x1) / 2 - page_center_x) < fig_width * 0.1:
+                placement = "center"
+            elif fig_x0 < page_width * 0.3:
+                placement = "left"
+            else:
+                placement = "right"
 
-                if caption_position:
-                    caption_positions.append(caption_position)
+            # Find figure caption (text near the figure)
+            figure_caption, caption_font_size, caption_position = self.find_figure_caption(layout[page_num], bbox)
 
+            if caption_font_size:
+                aggregates.figure_caption_font_sizes[caption_font_size] += 1
+
+            if placement:
+                aggregates.figure_placements[placement] += 1
+
+            if caption_position:
+                aggregates.figure_caption_positions[caption_position] += 1
+
+    def figure_data_result(self,aggregates):
         # Determine most frequent values
-        most_common_placement = self.most_frequent(figure_placements)
-        most_common_caption_position = self.most_frequent(caption_positions)
-        most_common_caption_font_size = self.most_frequent(caption_font_sizes)
+        most_common_placement = self.most_frequent(aggregates.figure_placements)
+        most_common_caption_position = self.most_frequent(aggregates.figure_caption_positions)
+        most_common_caption_font_size = self.most_frequent(aggregates.figure_caption_font_sizes)
 
         return {
             "figure_placement": {
@@ -438,82 +605,59 @@ class FormatExtractor:
         - If text appears *below* the figure, return "below"
         - If text appears *above* the figure, return "above"
         """
-        fig_x0, fig_y0, fig_x1, fig_y1 = bbox
-        caption_text = None
-        caption_font_size = None
-        caption_position = None
-
-        for block in page.get_text("dict")["blocks"]:
-            if "lines" in block:
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text_y0 = line["bbox"][1]  # Get Y-position of text
-                        font_size = round(span["size"])  # Extract font size
-                        line_text = span["text"].strip()
-
-                        # Check if text is directly below the figure
-                        if fig_y1 < text_y0 < fig_y1 + font_size * 3:
-                            caption_text = line_text
-                            caption_font_size = font_size
-                            caption_position = "below"
-                            return caption_text, caption_font_size, caption_position
-
-                        # Check if text is directly above the figure
-                        if fig_y0 - font_size * 3 < text_y0 < fig_y0:
-                            caption_text = line_text
-                            caption_font_size = font_size
-                            caption_position = "above"
-                            return caption_text, caption_font_size, caption_position
-
-        return caption_text, caption_font_size, caption_position
+        return page.caption_index.nearest_caption(bbox)
 
     def most_frequent(self,lst):
-        """Find the most common element in a list"""
+        """Find the most common element in a list (or Counter)"""
         if not lst:
             return None
         return Counter(lst).most_common(1)[0][0]
 
     # Table Data Extraction
-    def table_data_extractor(self,doc):
-        page_width = doc[0].rect.width  # Get the width of the first page for alignment checks
-
-        table_placements = []  # Store table alignment
-        caption_positions = []  # Store caption positions
-        caption_font_sizes = []  # Store caption font sizes
-
-        for page_num in range(len(doc)):  # Loop through all pages
-            page = doc[page_num]
-            tables = self.find_tables(page)  # Find potential table bounding boxes
-
-            for table_bbox in tables:
-                # Determine table alignment
-                table_x0, table_y0, table_x1, table_y1 = table_bbox
-                table_width = table_x1 - table_x0
-                page_center_x = page_width / 2
-
-                if abs((table_x0 + table_x1) / 2 - page_center_x) < table_width * 0.1:
-                    placement = "center"
-                elif table_x0 < page_width * 0.3:
-                    placement = "left"
-                else:
-                    placement = "right"
-
-                # Find table caption (text near the table)
-                table_caption, caption_font_size, caption_position = self.find_table_caption(page, table_bbox)
-
-                if caption_font_size:
-                    caption_font_sizes.append(caption_font_size)
-
-                if placement:
-                    table_placements.append(placement)
-
-                if caption_position:
-                    caption_positions.append(caption_position)
-
+    def table_data_extractor(self,layout):
+        page_width = layout.doc[0].rect.width  # Get the width of the first page for alignment checks
+
+        aggregates = PageAggregates()
+        for page_num in range(len(layout)):  # Loop through all pages
+            self.collect_table_data(layout, page_num, page_width, aggregates)
+        return self.table_data_result(aggregates)
+
+    def collect_table_data(self,layout, page_num, page_width, aggregates):
+        tables = self.find_tables(layout, page_num)  # Find ruled table bounding boxes
+        if not tables:
+            return
+        page = layout[page_num]
+
+        for table_bbox in tables:
+            # Determine table alignment
+            table_x0, table_y0, table_x1, table_y1 = table_bbox
+            table_width = table_x1 - table_x0
+            page_center_x = page_width / 2
+
+            if abs((table_x0 + table_x1) / 2 - page_center_x) < table_width * 0.1:
+                placement = "center"
+            elif table_x0 < page_width * 0.3:
+                placement = "left"
+            else:
+                placement = "right"
+
+            # Find table caption (text near the table)
+            table_caption, caption_font_size, caption_position = self.find_table_caption(page, table_bbox)
+
+            if caption_font_size:
+                aggregates.table_caption_font_sizes[caption_font_size] += 1
+
+            if placement:
+                aggregates.table_placements[placement] += 1
+
+            if caption_position:
+                aggregates.table_caption_positions[caption_position] += 1
+
+    def table_data_result(self,aggregates):
         # Determine most frequent values
-        most_common_placement = self.most_frequent(table_placements)
-        most_common_caption_position = self.most_frequent(caption_positions)
-        most_common_caption_font_size = self.most_frequent(caption_font_sizes)
+        most_common_placement = self.most_frequent(aggregates.table_placements)
+        most_common_caption_position = self.most_frequent(aggregates.table_caption_positions)
+        most_common_caption_font_size = self.most_frequent(aggregates.table_caption_font_sizes)
 
         return {
             "table_placement": {
@@ -523,19 +667,13 @@ class FormatExtractor:
             }
         }
 
-    def find_tables(self,page):
+    def find_tables(self,layout, page_num):
         """
-        Identify potential tables by detecting large structured text blocks.
-        - Looks for multiple consecutive text lines forming a structured shape.
+        Identify tables from the ruling lines and cell borders drawn on the page.
+        - The page's drawings are read once and clustered into grids (see tables.detect_table_bboxes)
+        - Results are cached on the layout, so every caller shares one detection per page
         """
-        table_bboxes = []
-
-        for block in page.get_text("dict")["blocks"]:
-            if "lines" in block and len(block["lines"]) > 2:  # More than 2 rows indicates a possible table
-                bbox = block["bbox"]
-                table_bboxes.append(bbox)
-
-        return table_bboxes
+        return layout.table_bboxes(page_num)
 
     def find_table_caption(self,page, bbox):
         """
@@ -543,34 +681,32 @@ class FormatExtractor:
         - If text appears *below* the table, return "below"
         - If text appears *above* the table, return "above"
         """
-        table_x0, table_y0, table_x1, table_y1 = bbox
-        caption_text = None
-        caption_font_size = None
-        caption_position = None
-
-        for block in page.get_text("dict")["blocks"]:
-            if "lines" in block:
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text_y0 = line["bbox"][1]  # Get Y-position of text
-                        font_size = round(span["size"])  # Extract font size
-                        line_text = span["text"].strip()
-
-                        # Check if text is directly below the table
-                        if table_y1 < text_y0 < table_y1 + font_size * 3:
-                            caption_text = line_text
-                            caption_font_size = font_size
-                            caption_position = "below"
-                            return caption_text, caption_font_size, caption_position
-
-                        # Check if text is directly above the table
-                        if table_y0 - font_size * 3 < text_y0 < table_y0:
-                            caption_text = line_text
-                            caption_font_size = font_size
-                            caption_position = "above"
-                            return caption_text, caption_font_size, caption_position
-
-        return caption_text, caption_font_size, caption_position
-
-        
-        
\ No newline at end of file
+        return page.caption_index.nearest_caption(bbox)
+
+
+# Per-process extractor of the pool workers, opened once by _init_worker
+_worker_extractor = None
+
+
+def _init_worker(pdf):
+    """Process-pool initializer: open a private document handle for this worker."""
+    global _worker_extractor
+    _worker_extractor = FormatExtractor(pdf)
+
+
+def _collect_page_range(start, stop, sections):
+    """
+    Process-pool worker: aggregate pages [start, stop) on the worker's document handle.
+    Returns (aggregates, metrics of this chunk).
+    """
+    _worker_extractor.instrumentation = Instrumentation()
+    layout = _worker_extractor.layout
+    parse_count, get_text_calls = layout.parse_count, layout.get_text_calls
+    get_drawings_calls, get_image_info_calls = layout.get_drawings_calls, layout.get_image_info_calls
+    with _worker_extractor.measure("collect_page_aggregates"):
+        aggregates = _worker_extractor.collect_page_aggregates(range(start, stop), sections)
+    _worker_extractor.instrumentation.count("page_parses", layout.parse_count - parse_count)
+    _worker_extractor.instrumentation.count("get_text_calls", layout.get_text_calls - get_text_calls)
+    _worker_extractor.instrumentation.count("get_drawings_calls", layout.get_drawings_calls - get_drawings_calls)
+    _worker_extractor.instrumentation.count("get_image_info_calls", layout.get_image_info_calls - get_image_info_calls)
+    return aggregates, _worker_extractor.instrumentation.to_dict()
@@ -1,69 +1,102 @@
-def generate_formatting_compliance_report(user_input:dict, extracted_output:dict)->dict:
-    compliance_report = {}
-
+def check_table_of_contents(user_section:dict, extracted_section:dict)->dict:
     # 1️⃣ Table of Contents (ToC)
-    toc_compliant = (user_input["table_of_contents"] == extracted_output["table_of_contents"])
-    compliance_report["Table of Contents (ToC)"] = "Compliant" if toc_compliant else "Non-compliant"
+    toc_compliant = (user_section == extracted_section)
+    return {"Table of Contents (ToC)": "Compliant" if toc_compliant else "Non-compliant"}
 
+def check_list_of_figures(user_section:dict, extracted_section:dict)->dict:
     # 2️⃣ List of Figures (LoF)
-    lof_compliant = (user_input["list_of_figures"] == extracted_output["list_of_figures"])
-    compliance_report["List of Figures (LoF)"] = "Compliant" if lof_compliant else "Non-compliant"
+    lof_compliant = (user_section == extracted_section)
+    return {"List of Figures (LoF)": "Compliant" if lof_compliant else "Non-compliant"}
 
+def check_abbreviations_section(user_section:dict, extracted_section:dict)->dict:
     # 3️⃣ Abbreviations Section
-    abbreviations_compliant = (user_input["abbreviations_section"] == extracted_output["abbreviations_section"])
-    compliance_report["Abbreviations Section"] = "Compliant" if abbreviations_compliant else "Non-compliant"
+    abbreviations_compliant = (user_section == extracted_section)
+    return {"Abbreviations Section": "Compliant" if abbreviations_compliant else "Non-compliant"}
 
+def check_font_type_size(user_section:dict, extracted_section:dict)->dict:
     # 4️⃣ Font Type & Size (Body Text)
     font_body_correct = (
-        user_input["font_type_size"]["body_font_type"].replace(" ", "").lower() ==
-        extracted_output["font_type_size"]["body_font_type"].replace(" ", "").lower() and
-        user_input["font_type_size"]["body_font_size"] == extracted_output["font_type_size"]["body_font_size"]
+        user_section["body_font_type"].replace(" ", "").lower() ==
+        extracted_section["body_font_type"].replace(" ", "").lower() and
+        user_section["body_font_size"] == extracted_section["body_font_size"]
     )
-    compliance_report["Font Type & Size"] = "Correct" if font_body_correct else "Incorrect"
 
     # 5️⃣ Header Fonts
     header_fonts_correct = (
-    normalize_font_name(user_input["font_type_size"]["heading_font_type"]) ==
-    normalize_font_name(extracted_output["font_type_size"]["heading_font_type"]) and
-    user_input["font_type_size"]["heading_font_size"] == extracted_output["font_type_size"]["heading_font_size"]
+    normalize_font_name(user_section["heading_font_type"]) ==
+    normalize_font_name(extracted_section["heading_font_type"]) and
+    user_section["heading_font_size"] == extracted_section["heading_font_size"]
     )
-    compliance_report["Header Fonts"] = "Correct" if header_fonts_correct else "Incorrect"
+    return {
+        "Font Type & Size": "Correct" if font_body_correct else "Incorrect",
+        "Header Fonts": "Correct" if header_fonts_correct else "Incorrect",
+    }
 
+def check_margins(user_section:dict, extracted_section:dict)->dict:
     # 6️⃣ Margins
-    margins_correct = (
-        user_input["margins"] == extracted_output["margins"]
-    )
-    compliance_report["Margins"] = "Correct" if margins_correct else "Incorrect"
+    margins_correct = (user_section == extracted_section)
+    return {"Margins": "Correct" if margins_correct else "Incorrect"}
 
+def check_text_alignment(user_section:dict, extracted_section:dict)->dict:
     # 7️⃣ Text Alignment
     text_alignment_correct = (
-        user_input["text_alignment"]["text_alignment"].lower() == 
-        extracted_output["text_alignment"]["text_alignment"].lower()
-    )
-    compliance_report["Text Alignment"] = (
-        "Justified" if text_alignment_correct else "Incorrect"
+        user_section["text_alignment"].lower() ==
+        extracted_section["text_alignment"].lower()
     )
+    return {"Text Alignment": "Justified" if text_alignment_correct else "Incorrect"}
 
+def check_figure_placement(user_section:dict, extracted_section:dict)->dict:
     # 8️⃣ Figure Placement
-    figure_placement_correct = (
-        user_input["figure_placement"] == extracted_output["figure_placement"]
-    )
-    compliance_report["Figure Placement"] = "Correct" if figure_placement_correct else "Incorrect"
+    figure_placement_correct = (user_section == extracted_section)
+    return {"Figure Placement": "Correct" if figure_placement_correct else "Incorrect"}
 
+def check_table_placement(user_section:dict, extracted_section:dict)->dict:
     # 9️⃣ Table Placement
-    table_placement_correct = (
-        user_input["table_placement"] == extracted_output["table_placement"]
-    )
-    compliance_report["Table Placement"] = "Correct" if table_placement_correct else "Incorrect"
+    table_placement_correct = (user_section == extracted_section)
+    return {"Table Placement": "Correct" if table_placement_correct else "Incorrect"}
 
+def check_references_formatting(user_section:dict, extracted_section:dict)->dict:
     # 🔟 References Formatting
-    references_correct = (
-        user_input["references_formatting"] == extracted_output["references_formatting"]
-    )
-    compliance_report["References Formatting"] = "Compliant" if references_correct else "Non-compliant"
+    references_correct = (user_section == extracted_section)
+    return {"References Formatting": "Compliant" if references_correct else "Non-compliant"}
+
+# Template/extracted section -> compliance check, in report order
+COMPLIANCE_CHECKS = {
+    "table_of_contents": check_table_of_contents,
+    "list_of_figures": check_list_of_figures,
+    "abbreviations_section": check_abbreviations_section,
+    "font_type_size": check_font_type_size,
+    "margins": check_margins,
+    "text_alignment": check_text_alignment,
+    "figure_placement": check_figure_placement,
+    "table_placement": check_table_placement,
+    "references_formatting": check_references_formatting,
+}
+
+# Template keys a check reads directly; the other checks compare whole sections
+TEMPLATE_REQUIRED_KEYS = {
+    "font_type_size": ("body_font_type", "body_font_size", "heading_font_type", "heading_font_size"),
+    "text_alignment": ("text_alignment",),
+}
 
+def generate_formatting_compliance_report(user_input:dict, extracted_output:dict)->dict:
+    """Check every section present in both the template and the extracted output."""
+    compliance_report = {}
+    for section, check in COMPLIANCE_CHECKS.items():
+        if section in user_input and section in extracted_output:
+            compliance_report.update(check(user_input[section], extracted_output[section]))
     return compliance_report
 
+def iter_formatting_compliance_report(user_input:dict, extracted_sections):
+    """
+    Incremental compliance report.
+    Consumes (section, extracted_section) pairs, e.g. from FormatExtractor.iter_extract(),
+    and yields (section, verdicts) as soon as each section is available.
+    """
+    for section, extracted_section in extracted_sections:
+        if section in user_input and section in COMPLIANCE_CHECKS:
+            yield section, COMPLIANCE_CHECKS[section](user_input[section], extracted_section)
+
 def normalize_font_name(font_name):
     """Normalize font names to a standard format."""
     font_mappings = {
@@ -0,0 +1,187 @@
+import re
+
+# Precompiled front-matter patterns
+TOC_HEADING = re.compile(r"\b(Table\s*of\s*Contents|Contents|Index)\b", re.IGNORECASE)
+TOC_SUBHEADING = re.compile(r"^\d+(\.\d+)*\s+[A-Za-z\s]+")
+LOF_HEADING = re.compile(r"\b(List\s*of\s*Figures|Figures|Figure Index)\b", re.IGNORECASE)
+LOF_CAPTION = re.compile(r"^(Figure|Fig\.|Table)\s+\d+[:.\s]")
+ABBREVIATIONS_HEADING = re.compile(r"\b(Abbreviations|List of Abbreviations|Acronyms)\b", re.IGNORECASE)
+ABBREVIATION_ENTRY = re.compile(r"^([A-Z0-9]{2,})\s*[-–—:]\s*(.+)$")  # Abbreviation - Long form
+CAPITALIZED_LINE = re.compile(r"^[A-Z\s]+$")
+
+# One combined alternation of the span-level headings. Almost every span misses it,
+# so the individual heading patterns only run on the few spans that hit.
+SPAN_HEADINGS = re.compile(
+    r"\b(?:Table\s*of\s*Contents|Contents|Index|List\s*of\s*Figures|Figures|Figure Index)\b",
+    re.IGNORECASE,
+)
+
+
+def check_sorting_order(abbreviations):
+    """Determine if abbreviations are sorted in ascending, descending, or no order."""
+    if abbreviations == sorted(abbreviations):
+        return "asc"
+    elif abbreviations == sorted(abbreviations, reverse=True):
+        return "desc"
+    else:
+        return "none"
+
+
+class TableOfContentsScanner:
+    """ToC state machine, fed span by span over the first 10 pages."""
+    section = "table_of_contents"
+    page_limit = 10
+
+    def __init__(self):
+        self.closed = False
+        self.toc_found = False  # Flag to track if ToC has started
+        self.toc_heading_size = None  # Track ToC heading font size (only once)
+        self.subheading_sizes = set()  # Track unique subheading font sizes
+        self.result = {"toc_present": False, "heading_font_size": None, "subheading_font_size": None}
+
+    def feed_span(self, line_text, font_size, heading_hit):
+        # Detect ToC heading (ensure we only capture the first occurrence)
+        if heading_hit and TOC_HEADING.search(line_text):
+            if not self.toc_found:  # Only set once
+                self.toc_found = True
+                self.toc_heading_size = font_size  # Store only the first ToC heading font size
+            return
+
+        # If ToC has started, keep extracting until a matching font size is detected
+        if self.toc_found:
+            # Stop when encountering a section heading of the same size as the ToC heading
+            if font_size == self.toc_heading_size:
+                self.closed = True
+                self.result = {
+                    "toc_present": True,
+                    "heading_font_size": self.toc_heading_size,
+                    "subheading_font_size": max(self.subheading_sizes) if self.subheading_sizes else None
+                }
+                return
+
+            # Identify ToC subheadings based on detected text patterns
+            if TOC_SUBHEADING.match(line_text):
+                self.subheading_sizes.add(font_size)  # Store unique subheading font sizes
+
+
+class ListOfFiguresScanner:
+    """LoF state machine, fed span by span over the first 10 pages."""
+    section = "list_of_figures"
+    page_limit = 10
+
+    def __init__(self):
+        self.closed = False
+        self.lof_found = False  # Flag to track if LoF has started
+        self.lof_heading_size = None  # Track LoF heading font size
+        self.figure_caption_sizes = set()  # Store unique font sizes of figure captions
+        self.result = {"lof_present": False, "figure_caption_font_size": None}
+
+    def feed_span(self, line_text, font_size, heading_hit):
+        # Detect LoF heading (ensuring we only capture the first occurrence)
+        if heading_hit and LOF_HEADING.search(line_text):
+            if not self.lof_found:  # Only set once
+                self.lof_found = True
+                self.lof_heading_size = font_size  # Store LoF heading font size
+            return
+
+        # If LoF has started, keep extracting until a matching font size is detected
+        if self.lof_found:
+            # Identify figure captions (likely smaller font size than heading)
+            if LOF_CAPTION.match(line_text):
+                self.figure_caption_sizes.add(font_size)  # Store caption font size
+
+            # Stop when encountering a section heading of the same size as the LoF heading,
+            # BUT only if we have already captured some figure captions.
+            if font_size == self.lof_heading_size and self.figure_caption_sizes:
+                self.closed = True
+                self.result = {
+                    "lof_present": True,
+                    "figure_caption_font_size": max(self.figure_caption_sizes)  # Return largest detected caption font
+                }
+
+
+class AbbreviationsScanner:
+    """Abbreviations state machine, fed page text line by line over the first 15 pages."""
+    section = "abbreviations_section"
+    page_limit = 15
+
+    def __init__(self):
+        self.closed = False
+        self.abbreviations_found = False  # Track if we are in the abbreviations list
+        self.abbreviations = []  # Store extracted abbreviations
+
+    def feed_page(self, page_text):
+        lines = [line.strip() for line in page_text.split("\n") if line.strip()]  # Remove empty lines
+
+        for line in lines:
+            # Detect Abbreviations heading
+            if ABBREVIATIONS_HEADING.search(line):
+                self.abbreviations_found = True  # Start collecting abbreviations
+                continue  # Move to the next line
+
+            # If in abbreviations section, extract valid abbreviation-long form pairs
+            if self.abbreviations_found:
+                match = ABBREVIATION_ENTRY.match(line)
+                if match:
+                    self.abbreviations.append(match.group(1))  # Store the abbreviation
+                else:
+                    # If a capitalized word appears without a valid format, stop reading this page
+                    if CAPITALIZED_LINE.match(line) and len(line.split()) <= 5:
+                        break
+
+    @property
+    def result(self):
+        return {
+            "abbreviations_section_present": True if self.abbreviations else False,
+            "abbreviations_sorted": check_sorting_order(self.abbreviations)
+        }
+
+
+FRONT_MATTER_SCANNERS = {
+    TableOfContentsScanner.section: TableOfContentsScanner,
+    ListOfFiguresScanner.section: ListOfFiguresScanner,
+    AbbreviationsScanner.section: AbbreviationsScanner,
+}
+
+
+def scan_front_matter(layout, sections=tuple(FRONT_MATTER_SCANNERS)):
+    """
+    Walk the front-matter pages once and drive the requested state machines together.
+    The walk stops as soon as every requested section has closed or passed its page limit.
+    Returns {section: result}.
+    """
+    scanners = [FRONT_MATTER_SCANNERS[section]() for section in FRONT_MATTER_SCANNERS if section in sections]
+    span_scanners = [scanner for scanner in scanners if hasattr(scanner, "feed_span")]
+    text_scanners = [scanner for scanner in scanners if hasattr(scanner, "feed_page")]
+
+    for page_num in range(len(layout)):
+        for scanner in scanners:
+            if page_num >= scanner.page_limit:
+                scanner.closed = True
+        open_span_scanners = [scanner for scanner in span_scanners if not scanner.closed]
+        open_text_scanners = [scanner for scanner in text_scanners if not scanner.closed]
+        if not open_span_scanners and not open_text_scanners:
+            break
+
+        page = layout[page_num]
+        if open_span_scanners:
+            _scan_page_spans(page, open_span_scanners)
+        for scanner in open_text_scanners:
+            scanner.feed_page(page.text)
+
+    return {scanner.section: scanner.result for scanner in scanners}
+
+
+def _scan_page_spans(page, scanners):
+    for block in page.blocks:
+        for line in block.lines:
+            for span in line.spans:
+                font_size = round(span.size)  # Extract font size
+                line_text = span.text.strip()
+                heading_hit = SPAN_HEADINGS.search(line_text) is not None
+
+                for scanner in scanners:
+                    if not scanner.closed:
+                        scanner.feed_span(line_text, font_size, heading_hit)
+                if all(scanner.closed for scanner in scanners):
+                    return
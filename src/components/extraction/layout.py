@@ -0,0 +1,263 @@
+from bisect import bisect_left, bisect_right
+from typing import List, NamedTuple, Tuple
+import sys
+import fitz
+import numpy as np
+from src.components.extraction.tables import detect_table_bboxes
+
+BBox = Tuple[float, float, float, float]
+
+
+def text_flags(preserve_ligatures=True, preserve_whitespace=True):
+    """
+    TextPage flags of the text extractors: the "dict" profile without image blocks,
+    so MuPDF never decodes image payloads into the page dict (figure geometry comes from image_bboxes).
+    Ligatures and whitespace are preserved by default, as get_text("dict") does.
+    """
+    flags = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+    if not preserve_ligatures:
+        flags &= ~fitz.TEXT_PRESERVE_LIGATURES  # Expand ligatures such as "fi" into their letters
+    if not preserve_whitespace:
+        flags &= ~fitz.TEXT_PRESERVE_WHITESPACE  # Turn tabs and special spaces into plain spaces
+    return flags
+
+
+TEXT_FLAGS = text_flags()
+
+
+class Span(NamedTuple):
+    text: str
+    font: str
+    size: float
+
+
+class Line(NamedTuple):
+    bbox: BBox
+    spans: List[Span]
+
+
+class Block(NamedTuple):
+    bbox: BBox
+    lines: List[Line]
+
+
+class LineArray(NamedTuple):
+    """Line bboxes of a set of pages as one contiguous array, tagged with page and block ids."""
+    bboxes: np.ndarray  # (lines, 4) float64: x0, y0, x1, y1
+    page_ids: np.ndarray  # (lines,) position of the line's page in the requested page list
+    block_ids: np.ndarray  # (lines,) block number, unique across the requested pages
+    block_count: int  # Number of text blocks, including blocks without lines
+
+
+class PageLayout:
+    """
+    Compact, parsed view of a single page.
+    - `blocks` holds only text blocks (blocks -> lines -> spans)
+    - `text` is the plain text of the page, as `page.get_text("text")` returns it
+    """
+    __slots__ = ("number", "width", "height", "blocks", "text", "span_count", "_caption_index", "_line_bboxes", "_line_blocks")
+
+    def __init__(self, number, width, height, blocks, text):
+        self.number = number
+        self.width = width
+        self.height = height
+        self.blocks = blocks
+        self.text = text
+        self.span_count = sum(len(line.spans) for block in blocks for line in block.lines)
+        self._caption_index = None
+        self._line_bboxes = None
+        self._line_blocks = None
+
+    @property
+    def caption_index(self):
+        """Line y-position index of this page, built on first use."""
+        if self._caption_index is None:
+            self._caption_index = CaptionIndex(self.blocks)
+        return self._caption_index
+
+    @property
+    def line_bboxes(self):
+        """(lines, 4) array of the page's line bboxes in reading order, built on first use."""
+        if self._line_bboxes is None:
+            self._build_line_arrays()
+        return self._line_bboxes
+
+    @property
+    def line_blocks(self):
+        """Block number (within the page) of every row of line_bboxes."""
+        if self._line_blocks is None:
+            self._build_line_arrays()
+        return self._line_blocks
+
+    def _build_line_arrays(self):
+        bboxes = [line.bbox for block in self.blocks for line in block.lines]
+        self._line_bboxes = np.array(bboxes, dtype=np.float64).reshape(len(bboxes), 4)
+        self._line_blocks = np.array(
+            [block_num for block_num, block in enumerate(self.blocks) for _ in block.lines], dtype=np.int64
+        )
+
+
+class CaptionIndex:
+    """
+    Spans of a page sorted by the y-position of their line.
+    A caption lookup only visits spans whose line starts inside the search window
+    around the object, instead of walking every span on the page.
+    """
+
+    def __init__(self, blocks):
+        entries = []
+        order = 0  # Reading-order position, used to pick the same span as a linear scan
+        for block in blocks:
+            for line in block.lines:
+                for span in line.spans:
+                    entries.append((line.bbox[1], order, round(span.size), span.text.strip()))
+                    order += 1
+        entries.sort()
+
+        self.entries = entries
+        self.y_positions = [entry[0] for entry in entries]
+        self.max_font_size = max((entry[2] for entry in entries), default=0)
+
+    def nearest_caption(self, bbox):
+        """
+        Find the first span (in reading order) that starts within 3x its font size
+        below or above the given bbox.
+        Returns (caption_text, caption_font_size, caption_position).
+        """
+        _, obj_y0, _, obj_y1 = bbox
+        reach = self.max_font_size * 3  # Widest window any span on the page can have
+        best = None
+
+        # Text directly below the object
+        start = bisect_right(self.y_positions, obj_y1)
+        end = bisect_left(self.y_positions, obj_y1 + reach)
+        for text_y0, order, font_size, line_text in self.entries[start:end]:
+            if obj_y1 < text_y0 < obj_y1 + font_size * 3 and (best is None or order < best[0]):
+                best = (order, line_text, font_size, "below")
+
+        # Text directly above the object
+        start = bisect_right(self.y_positions, obj_y0 - reach)
+        end = bisect_left(self.y_positions, obj_y0)
+        for text_y0, order, font_size, line_text in self.entries[start:end]:
+            if obj_y0 - font_size * 3 < text_y0 < obj_y0 and (best is None or order < best[0]):
+                best = (order, line_text, font_size, "above")
+
+        if best is None:
+            return None, None, None
+        return best[1], best[2], best[3]
+
+
+class DocumentLayout:
+    """
+    Per-document layout model shared by all extractors.
+    Each page is run through MuPDF's layout analysis once (one TextPage per page),
+    and every extractor reads the cached PageLayout instead of calling get_text() again.
+    With max_cached_pages set, only the most recently parsed pages are kept, so memory
+    stays flat however long the document is (pages read again are parsed again).
+    """
+
+    def __init__(self, doc, flags=TEXT_FLAGS, max_cached_pages=None):
+        self.doc = doc
+        self.flags = flags  # TextPage flags, see text_flags()
+        self.max_cached_pages = max_cached_pages  # None keeps every parsed page
+        self._pages = {}
+        self.parse_count = 0  # Number of MuPDF layout passes performed
+        self.get_text_calls = 0
+        self.get_drawings_calls = 0
+        self.get_image_info_calls = 0
+        self._tables = {}
+        self._images = {}
+        self.visited = {}  # Page number -> span count of the pages read since the last clear(), for instrumentation
+
+    def __len__(self):
+        return len(self.doc)
+
+    def __getitem__(self, page_num) -> PageLayout:
+        if page_num < 0:
+            page_num += len(self.doc)
+        page_layout = self._pages.get(page_num)
+        if page_layout is None:
+            page_layout = self.parse_page(page_num)
+            self._remember(self._pages, page_num, page_layout)
+        self.visited[page_num] = page_layout.span_count
+        return page_layout
+
+    def __iter__(self):
+        for page_num in range(len(self.doc)):
+            yield self[page_num]
+
+    def table_bboxes(self, page_num) -> List[BBox]:
+        """Ruled table bboxes of a page, detected from its vector graphics once and cached."""
+        if page_num < 0:
+            page_num += len(self.doc)
+        tables = self._tables.get(page_num)
+        if tables is None:
+            tables = detect_table_bboxes(self.doc[page_num])
+            self.get_drawings_calls += 1
+            self._remember(self._tables, page_num, tables)
+        return tables
+
+    def image_bboxes(self, page_num) -> List[BBox]:
+        """
+        Placement bbox of every image on a page, from one get_image_info() pass, cached.
+        Each image (xref) appears once, at its first placement in display order; images reused
+        on the page (or identical copies of one image) are not counted twice.
+        Inline images (xref 0) and images without a placement are left out.
+        """
+        if page_num < 0:
+            page_num += len(self.doc)
+        images = self._images.get(page_num)
+        if images is None:
+            placements = {}
+            for info in self.doc[page_num].get_image_info(xrefs=True):
+                if info["xref"] and info["xref"] not in placements and not fitz.Rect(info["bbox"]).is_empty:
+                    placements[info["xref"]] = tuple(info["bbox"])
+            self.get_image_info_calls += 1
+            images = list(placements.values())
+            self._remember(self._images, page_num, images)
+        return images
+
+    def _remember(self, cache, page_num, value):
+        """Store a per-page result, evicting the oldest pages beyond max_cached_pages."""
+        cache[page_num] = value
+        if self.max_cached_pages is not None:
+            while len(cache) > self.max_cached_pages:
+                del cache[next(iter(cache))]
+
+    def line_array(self, page_numbers) -> LineArray:
+        """Gather the line bboxes of the given pages into one LineArray."""
+        bboxes, page_ids, block_ids = [], [], []
+        block_offset = 0
+        for page_index, page_num in enumerate(page_numbers):
+            page = self[page_num]
+            bboxes.append(page.line_bboxes)
+            page_ids.append(np.full(len(page.line_bboxes), page_index, dtype=np.int64))
+            block_ids.append(page.line_blocks + block_offset)
+            block_offset += len(page.blocks)
+
+        if not bboxes:
+            return LineArray(np.empty((0, 4)), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), 0)
+        return LineArray(np.concatenate(bboxes), np.concatenate(page_ids), np.concatenate(block_ids), block_offset)
+
+    def parse_page(self, page_num) -> PageLayout:
+        """Parse one page into a PageLayout using a single TextPage."""
+        page = self.doc[page_num]
+        textpage = page.get_textpage(flags=self.flags)
+        page_dict = page.get_text("dict", textpage=textpage)
+        text = page.get_text("text", textpage=textpage)
+        self.parse_count += 1
+        self.get_text_calls += 2
+
+        blocks = []
+        for block in page_dict["blocks"]:
+            if "lines" in block:
+                lines = [
+                    Line(
+                        tuple(line["bbox"]),
+                        [Span(span["text"], sys.intern(span["font"]), span["size"]) for span in line["spans"]],
+                    )
+                    for line in block["lines"]
+                ]
+                blocks.append(Block(tuple(block["bbox"]), lines))
+
+        return PageLayout(page_num, page.rect.width, page.rect.height, blocks, text)
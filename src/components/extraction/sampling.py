@@ -0,0 +1,173 @@
+import math
+import random
+from collections import Counter
+from dataclasses import dataclass
+import numpy as np
+
+# Sections that can be estimated from a page sample
+SAMPLED_SECTIONS = ("font_type_size", "margins", "text_alignment")
+MARGIN_SIDES = ("left", "right", "top", "bottom")
+MAX_SAMPLED_CONFIDENCE = 0.99  # Only a pass over every page is certain
+
+
+@dataclass
+class SamplingConfig:
+    strata: int = 10  # Contiguous page bands; every round samples one new page from each band
+    min_rounds: int = 2  # Rounds before the first stopping test, so the spread between pages can be estimated
+    target_confidence: float = 0.95  # Stop once every estimable statistic is at least this confident
+    seed: int = 0  # Fixed seed, so the same document always gets the same sample
+
+
+def stratified_rounds(page_count, config: SamplingConfig):
+    """
+    Yield rounds of page numbers: one not yet visited page per stratum per round,
+    until every page has been visited.
+    """
+    rng = random.Random(config.seed)
+    strata_count = max(1, min(config.strata, page_count))
+    strata = []
+    for index in range(strata_count):
+        stratum = list(range(index * page_count // strata_count, (index + 1) * page_count // strata_count))
+        rng.shuffle(stratum)
+        strata.append(stratum)
+
+    while any(strata):
+        yield [stratum.pop() for stratum in strata if stratum]
+
+
+def _normal_cdf(z):
+    return 0.5 * (1 + math.erf(z / math.sqrt(2)))
+
+
+def standard_error(values, population):
+    """
+    Standard error of the mean of `values`, sampled without replacement from `population` pages
+    (with the finite-population correction, so it is 0 once every page is in the sample).
+    """
+    n = len(values)
+    if n >= population:
+        return 0.0
+    if n < 2:
+        return math.inf
+    return float(np.std(values, ddof=1)) / math.sqrt(n) * math.sqrt((population - n) / (population - 1))
+
+
+def _skewness(values):
+    spread = values.std()
+    if spread == 0:
+        return 0.0
+    return float((((values - values.mean()) / spread) ** 3).mean())
+
+
+def _mean_stays_within(values, population, below, above):
+    """
+    Probability that the document mean lies within (sample mean - below, sample mean + above).
+    - Normal approximation with the finite-population standard error while Cochran's rule
+      (n > 25 * skewness^2) says the sample mean is close enough to normal
+    - Otherwise the mean hangs on a few outlying pages, and the Hoeffding-Serfling bound over the
+      sampled range is used instead: no shape assumption, and still tight when the outliers are
+      too small to move the mean across a boundary
+    """
+    n = len(values)
+    if n >= population:
+        return 1.0
+    if n < 2:
+        return 0.0
+    values = np.asarray(values, dtype=np.float64)
+    spread = float(values.max() - values.min())
+    if spread == 0:
+        return 1.0  # Every sampled page agrees; the cap in section_confidence keeps this below 1.0
+    if n > 25 * _skewness(values) ** 2:
+        error = standard_error(values, population)
+        if error == 0:
+            return 1.0
+        return _normal_cdf(below / error) + _normal_cdf(above / error) - 1
+
+    scale = (1 - (n - 1) / population) * spread ** 2
+    tail = lambda distance: math.exp(-2 * n * distance ** 2 / scale)
+    return max(0.0, 1 - tail(below) - tail(above))
+
+
+def rounding_confidence(values, population):
+    """
+    Probability that the document mean rounds to the same whole number as the sample mean,
+    from the distances between the sample mean and the two .5 rounding boundaries.
+    """
+    if not values:
+        return 0.0
+    mean = float(np.mean(values))
+    nearest = math.floor(mean + 0.5)
+    return _mean_stays_within(values, population, mean - (nearest - 0.5), nearest + 0.5 - mean)
+
+
+def mode_confidence(page_counts, population):
+    """
+    Probability that the most frequent value of the sample is also the most frequent of the document.
+    - page_counts: one Counter (value -> occurrences) per sampled page
+    The leader is compared with the runner-up through the per-page difference of their counts:
+    the leader stays ahead when the mean difference over all pages stays above 0.
+    """
+    totals = Counter()
+    for counts in page_counts:
+        totals.update(counts)
+    if not totals:
+        return 0.0
+    leaders = totals.most_common(2)
+    leader = leaders[0][0]
+    runner_up = leaders[1][0] if len(leaders) > 1 else None
+    differences = [counts[leader] - (counts[runner_up] if runner_up is not None else 0) for counts in page_counts]
+    mean = float(np.mean(differences))
+    if mean <= 0:
+        return 0.5  # Tied in the sample
+    return _mean_stays_within(differences, population, mean, math.inf)
+
+
+def page_statistics(partial):
+    """The per-page values the confidences are computed from, derived once from a page's PageAggregates."""
+    return {
+        "margins": partial.margins,
+        "alignments": partial.alignments,
+        "font_types": partial.font_types,
+        "font_sizes": partial.font_sizes,
+        "font_pairs": partial.font_pairs,
+        "heading_font_size": partial.heading_font_size,
+    }
+
+
+def section_confidence(section, pages, page_total):
+    """
+    Confidence that a section estimated from the sampled pages equals the full pass.
+    - pages: page_statistics() of every sampled page
+    Returns (confidence, estimable confidence). The estimable one covers the means and modes,
+    whose sampling error the sample itself measures. The heading font size is a document maximum,
+    which a sample cannot bound: it counts with the share of pages visited, since a heading larger
+    than any sampled one could sit on any unvisited page.
+    Neither value is 1.0 unless every page was visited.
+    """
+    sampled = len(pages)
+    if sampled >= page_total:
+        return 1.0, 1.0
+
+    if section == "margins":
+        estimable = min(
+            rounding_confidence([value for page in pages for value in page["margins"][side]], page_total)
+            for side in MARGIN_SIDES
+        )
+        confidence = estimable
+    elif section == "text_alignment":
+        estimable = confidence = mode_confidence([page["alignments"] for page in pages], page_total)
+    else:
+        heading_font_size = max((page["heading_font_size"] for page in pages if page["heading_font_size"] is not None), default=None)
+        heading_fonts = [
+            Counter({font_type: count for (font_type, font_size), count in page["font_pairs"].items() if font_size == heading_font_size})
+            for page in pages
+        ]
+        estimable = min(
+            mode_confidence([page["font_types"] for page in pages], page_total),
+            mode_confidence([page["font_sizes"] for page in pages], page_total),
+            mode_confidence(heading_fonts, page_total),
+        )
+        confidence = min(estimable, sampled / page_total)
+
+    return (round(min(confidence, MAX_SAMPLED_CONFIDENCE), 2),
+            round(min(estimable, MAX_SAMPLED_CONFIDENCE), 2))
@@ -0,0 +1,116 @@
+from typing import List, Tuple
+import fitz
+
+RULE_TOLERANCE = 2.0  # Max thickness of a ruling line, and the gap still treated as touching (points)
+MIN_TABLE_WIDTH = 30.0
+MIN_TABLE_HEIGHT = 15.0
+FULL_RULE_FRACTION = 0.9  # A rule crossing this share of the table counts as a full row/column separator
+
+
+def _ruling_rects(page):
+    """
+    Read the page's vector graphics once and return the ruling lines and borders as rects.
+    Filled, unstroked areas (code listing or highlight backgrounds) are skipped,
+    except thin ones, which are how many producers draw ruling lines.
+    """
+    rects = []
+    for path in page.get_drawings():
+        stroked = path.get("color") is not None
+        for item in path["items"]:
+            kind = item[0]
+            if kind == "l":
+                rect = fitz.Rect(item[1], item[2])
+            elif kind == "re":
+                rect = fitz.Rect(item[1])
+            elif kind == "qu":
+                rect = item[1].rect
+            else:
+                continue  # Curves are never table rules
+            rect.normalize()
+
+            thin = rect.width <= RULE_TOLERANCE or rect.height <= RULE_TOLERANCE
+            if rect.width <= RULE_TOLERANCE and rect.height <= RULE_TOLERANCE:
+                continue  # Dots
+            if not stroked and not thin:
+                continue
+            rects.append(rect)
+    return rects
+
+
+def _cluster(rects):
+    """Group rects that touch (within RULE_TOLERANCE) with a sweep over x and union-find."""
+    parent = list(range(len(rects)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    active = []
+    for i in sorted(range(len(rects)), key=lambda i: rects[i].x0):
+        rect = rects[i]
+        active = [j for j in active if rects[j].x1 + RULE_TOLERANCE >= rect.x0]
+        for j in active:
+            if rects[j].y0 - RULE_TOLERANCE <= rect.y1 and rect.y0 <= rects[j].y1 + RULE_TOLERANCE:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[root_i] = root_j
+        active.append(i)
+
+    clusters = {}
+    for i, rect in enumerate(rects):
+        clusters.setdefault(find(i), []).append(rect)
+    return list(clusters.values())
+
+
+def _covered_length(segments):
+    """Total length covered by a list of (start, end) segments."""
+    covered, end = 0.0, float("-inf")
+    for start, stop in sorted(segments):
+        if stop > end:
+            covered += stop - max(start, end)
+            end = stop
+    return covered
+
+
+def _is_grid(rects, bbox):
+    """
+    A cluster is a table when its edges form a grid: at least two distinct row and column
+    rules (six in total), and at least three rows or three columns crossing the whole table.
+    Flowchart boxes and framed figures rarely have rules spanning the whole cluster.
+    """
+    rows, columns = {}, {}  # Rule position bucket -> segments drawn at that position
+    for rect in rects:
+        if rect.width > RULE_TOLERANCE:
+            rows.setdefault(round(rect.y0 / RULE_TOLERANCE), []).append((rect.x0, rect.x1))
+        if rect.height > RULE_TOLERANCE:
+            columns.setdefault(round(rect.x0 / RULE_TOLERANCE), []).append((rect.y0, rect.y1))
+        if rect.width > RULE_TOLERANCE and rect.height > RULE_TOLERANCE:
+            # A box contributes all four of its edges
+            rows.setdefault(round(rect.y1 / RULE_TOLERANCE), []).append((rect.x0, rect.x1))
+            columns.setdefault(round(rect.x1 / RULE_TOLERANCE), []).append((rect.y0, rect.y1))
+
+    if len(rows) < 2 or len(columns) < 2 or len(rows) + len(columns) < 6:
+        return False
+    full_rows = sum(_covered_length(segments) >= bbox.width * FULL_RULE_FRACTION for segments in rows.values())
+    full_columns = sum(_covered_length(segments) >= bbox.height * FULL_RULE_FRACTION for segments in columns.values())
+    return full_rows >= 3 or full_columns >= 3
+
+
+def detect_table_bboxes(page) -> List[Tuple[float, float, float, float]]:
+    """
+    Find ruled tables on a page from its vector graphics (one get_drawings() call).
+    Ruling lines and cell borders are clustered into connected grids; each grid's bbox is a table.
+    Returns bboxes sorted top to bottom, then left to right.
+    """
+    tables = []
+    for rects in _cluster(_ruling_rects(page)):
+        # Not Rect union: ruling lines are zero-height/width rects, which PyMuPDF treats as empty and skips
+        bbox = fitz.Rect(min(rect.x0 for rect in rects), min(rect.y0 for rect in rects),
+                         max(rect.x1 for rect in rects), max(rect.y1 for rect in rects))
+        if bbox.width < MIN_TABLE_WIDTH or bbox.height < MIN_TABLE_HEIGHT:
+            continue
+        if _is_grid(rects, bbox):
+            tables.append(tuple(bbox))
+    return sorted(tables, key=lambda bbox: (bbox[1], bbox[0]))
@@ -1,19 +1,20 @@
 import re
-from together import Together
 import json
+from src.components.llm_client import get_llm_client
 
-def extract_metadata_llama(text)->dict:
+def extract_metadata_llama(text, client=None)->dict:
     """
-    Extracts metadata from the given document text using Llama 2 API via Together AI.
+    Extracts metadata from the given document text using Llama 2, via Together AI by default.
     
     Parameters:
         text (str): The document text to process.
+        client: Optional LLM client with a complete(prompt) method (see src.components.llm_client);
+            the process-wide default client when None.
     
     Returns:
         dict: The extracted metadata in JSON format.
     """
-    # Initialize Together AI Client
-    client = Together(api_key="61feb712ca012f046fb68a4a3ead3554091b6053a880b32f6babc10fcde23e09")
+    client = client or get_llm_client()
     # Construct Prompt
     prompt = f"""
     Extract metadata from the following document:
@@ -26,24 +27,8 @@ def extract_metadata_llama(text)->dict:
     2. Do not reply any other information, just the valid json response.
     """
     
-    # Call Llama 2 on Together AI
-    response = client.chat.completions.create(
-        model="meta-llama/Llama-Vision-Free",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=512,
-        temperature=0.5,
-        top_p=0.7,
-        top_k=50,
-        repetition_penalty=1,
-        stop=["<|eot_id|>", "<|eom_id|>"],
-        stream=True  # Streaming Response
-    )
-
-    # Process response
-    output = ""
-    for token in response:
-        if hasattr(token, 'choices') and token.choices:
-            output += token.choices[0].delta.content
+    # Call Llama 2
+    output = client.complete(prompt)
     # Extract JSON content (find the first occurrence of `{` and extract everything from there)
     match = re.search(r'\{.*', output, re.DOTALL)
     cleaned_output = ""
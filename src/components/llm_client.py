@@ -0,0 +1,120 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+import requests
+
+STOP_TOKENS = ["<|eot_id|>", "<|eom_id|>"]
+
+
+@dataclass
+class LLMClientConfig:
+    model: str = "meta-llama/Llama-Vision-Free"
+    base_url: Optional[str] = None  # OpenAI-compatible server (e.g. http://127.0.0.1:8000/v1); Together AI when None
+    api_key: Optional[str] = None  # Together: this or TOGETHER_API_KEY is required; optional for local servers
+    timeout: Optional[float] = 60.0  # Seconds per HTTP request, so a hung call does not hold its thread forever
+    max_tokens: int = 512
+    temperature: float = 0.5
+    top_p: float = 0.7
+
+
+class TogetherLLMClient:
+    """
+    Chat completions on Together AI, read as a stream. The API key comes from the config or TOGETHER_API_KEY,
+    and is looked up on the first call: a missing key fails that call, not the construction.
+    """
+
+    def __init__(self, config: LLMClientConfig = None):
+        self.client_config = config or LLMClientConfig()
+        self.client = None
+        self._client_lock = threading.Lock()
+
+    def _get_client(self):
+        with self._client_lock:
+            if self.client is None:
+                api_key = self.client_config.api_key or os.environ.get("TOGETHER_API_KEY")
+                if not api_key:
+                    raise ValueError("No Together AI API key: set TOGETHER_API_KEY or LLMClientConfig.api_key, "
+                                     "or use an OpenAI-compatible server through LLMClientConfig.base_url / LLM_BASE_URL")
+                from together import Together
+                self.client = Together(api_key=api_key, timeout=self.client_config.timeout)
+            return self.client
+
+    def complete(self, prompt):
+        response = self._get_client().chat.completions.create(
+            model=self.client_config.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=self.client_config.max_tokens,
+            temperature=self.client_config.temperature,
+            top_p=self.client_config.top_p,
+            top_k=50,
+            repetition_penalty=1,
+            stop=STOP_TOKENS,
+            stream=True  # Streaming Response
+        )
+        output = ""
+        for token in response:
+            if hasattr(token, 'choices') and token.choices:
+                output += token.choices[0].delta.content or ""
+        return output
+
+
+class OpenAICompatibleLLMClient:
+    """
+    Chat completions on any server speaking the OpenAI API (vLLM, llama.cpp server, Ollama, a test stub),
+    for offline deployments and tests.
+    """
+
+    def __init__(self, config: LLMClientConfig):
+        self.client_config = config
+        self.session = requests.Session()
+        if config.api_key:
+            self.session.headers["Authorization"] = f"Bearer {config.api_key}"
+
+    def complete(self, prompt):
+        response = self.session.post(
+            f"{self.client_config.base_url.rstrip('/')}/chat/completions",
+            json={
+                "model": self.client_config.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "max_tokens": self.client_config.max_tokens,
+                "temperature": self.client_config.temperature,
+                "top_p": self.client_config.top_p,
+                "stop": STOP_TOKENS,
+            },
+            timeout=self.client_config.timeout,
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"] or ""
+
+
+def create_llm_client(config: LLMClientConfig = None):
+    """A client with a complete(prompt) -> str method: the OpenAI-compatible one when base_url is set, else Together."""
+    config = config or LLMClientConfig()
+    if config.base_url:
+        return OpenAICompatibleLLMClient(config)
+    return TogetherLLMClient(config)
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """The process-wide default client, built on first use (LLM_BASE_URL / LLM_MODEL select a local server)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            config = LLMClientConfig(base_url=os.environ.get("LLM_BASE_URL") or None)
+            if os.environ.get("LLM_MODEL"):
+                config.model = os.environ["LLM_MODEL"]
+            _default_client = create_llm_client(config)
+        return _default_client
+
+
+def llm_client_identity(client):
+    """What an LLM answer depends on, for cache keys: the model and server of the built-in clients, else the client's type."""
+    config = getattr(client, "client_config", None)
+    if isinstance(config, LLMClientConfig):
+        return f"{config.model}@{config.base_url or 'together'}"
+    return f"{type(client).__module__}.{type(client).__qualname__}"
@@ -0,0 +1,100 @@
+import os
+import sys
+import argparse
+import inspect
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import logging
+
+# File names inside <model dir>/onnx, read by the onnx and onnx-int8 inference backends
+ONNX_SUBDIR = "onnx"
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model.int8.onnx"
+
+
+@dataclass
+class ModelExporterConfig:
+    model_path: str = os.path.join("artifacts", "fine_tuned_bert_ner")  # Saved by ModelTrainer
+    opset_version: int = 17
+
+
+def onnx_model_path(model_path, quantized=False):
+    return os.path.join(model_path, ONNX_SUBDIR, ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+
+
+class ModelExporter:
+    """
+    Export the fine-tuned BERT NER model to ONNX for CPU inference with ONNX Runtime,
+    optionally with a dynamically int8-quantized copy (weights in int8, activations quantized at run time).
+    The tokenizer and config stay in the model directory and are shared by every backend.
+    """
+
+    def __init__(self, config: ModelExporterConfig = None):
+        self.model_exporter_config = config or ModelExporterConfig()
+
+    def initiate_model_export(self, quantize=True):
+        try:
+            import torch
+            from transformers import AutoModelForTokenClassification, AutoTokenizer
+
+            model_path = self.model_exporter_config.model_path
+            output_path = onnx_model_path(model_path)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+            logging.info(f"Exporting {model_path} to ONNX")
+            tokenizer = AutoTokenizer.from_pretrained(model_path)
+            model = AutoModelForTokenClassification.from_pretrained(model_path)
+            model.eval()
+
+            # Batch and sequence length stay dynamic, so the session serves padded micro-batches
+            sample = tokenizer(["Submitted by: Jane Doe (101)", "Tribhuvan University"], padding=True, return_tensors="pt")
+            # Graph inputs follow forward()'s parameter order, which is not the tokenizer's order
+            input_names = [name for name in inspect.signature(model.forward).parameters if name in sample]
+            dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+            dynamic_axes["logits"] = {0: "batch", 1: "sequence"}
+            with torch.inference_mode():
+                torch.onnx.export(
+                    model,
+                    ({name: sample[name] for name in input_names},),  # Passed as keyword arguments of forward()
+                    output_path,
+                    input_names=input_names,
+                    output_names=["logits"],
+                    dynamic_axes=dynamic_axes,
+                    opset_version=self.model_exporter_config.opset_version,
+                    do_constant_folding=True,
+                )
+            logging.info(f"ONNX model saved to {output_path}")
+
+            paths = [output_path]
+            if quantize:
+                paths.append(self.quantize(output_path))
+            return paths
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def quantize(self, output_path):
+        """Write the dynamic int8 variant next to the float32 ONNX model."""
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantized_path = os.path.join(os.path.dirname(output_path), ONNX_INT8_MODEL_FILE)
+            quantize_dynamic(output_path, quantized_path, weight_type=QuantType.QInt8)
+            logging.info(f"Quantized ONNX model saved to {quantized_path}")
+            return quantized_path
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the fine-tuned BERT NER model to ONNX.")
+    parser.add_argument("--model-path", default=ModelExporterConfig.model_path)
+    parser.add_argument("--opset", type=int, default=ModelExporterConfig.opset_version)
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 quantized variant")
+    args = parser.parse_args(argv)
+
+    exporter = ModelExporter(ModelExporterConfig(model_path=args.model_path, opset_version=args.opset))
+    for path in exporter.initiate_model_export(quantize=not args.no_quantize):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from src.exception import CustomException
+from src.logger import logging
+from src.components.model_exporter import onnx_model_path
+
+WARM_UP_TEXT = "Submitted by: Jane Doe (101) Under the Supervision of Mr. Richard Poe Tribhuvan University February 2025"
+
+
+@dataclass
+class ModelRegistryConfig:
+    default_model_path: str = os.path.join('artifacts', 'fine_tuned_bert_ner')
+    max_models: int = 2  # Least recently used models are dropped above this many
+    backend: str = "torch"  # Default inference backend, a key of INFERENCE_BACKENDS
+
+
+def load_ner_pipeline(model_path):
+    """Load a fine-tuned token-classification model and its tokenizer into an NER pipeline."""
+    from transformers import pipeline, AutoTokenizer, AutoModelForTokenClassification
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForTokenClassification.from_pretrained(model_path)
+    return pipeline("ner", model=model, tokenizer=tokenizer)
+
+
+def load_onnx_ner_pipeline(model_path, quantized=False):
+    """Load the ONNX export of a model (see ModelExporter) into an ONNX Runtime NER pipeline."""
+    from src.components.ner_inference import OnnxNERPipeline
+    return OnnxNERPipeline(model_path, onnx_model_path(model_path, quantized))
+
+
+# Inference backend -> loader of a model directory
+INFERENCE_BACKENDS = {
+    "torch": load_ner_pipeline,
+    "onnx": load_onnx_ner_pipeline,
+    "onnx-int8": partial(load_onnx_ner_pipeline, quantized=True),
+}
+
+
+class ModelRegistry:
+    """
+    Process-wide store of loaded NER pipelines, keyed by model directory and inference backend.
+    - get(path, backend): loads a model on first use; concurrent callers of the same model wait
+      for one load instead of loading it twice, while other models stay available
+    - warm_up(paths, backend): loads the models and runs one forward pass ahead of the first request
+    At most max_models models are kept; the least recently used one is dropped first.
+    """
+
+    def __init__(self, config: ModelRegistryConfig = None, loaders=None):
+        self.registry_config = config or ModelRegistryConfig()
+        self.loaders = loaders or INFERENCE_BACKENDS  # Backend -> loader of a model directory
+        self.load_count = 0
+        self._models = OrderedDict()  # (absolute model path, backend) -> model, least recently used first
+        self._loading = {}  # (absolute model path, backend) -> lock held while that model loads
+        self._lock = threading.Lock()
+
+    def _key(self, model_path, backend=None):
+        backend = backend or self.registry_config.backend
+        if backend not in self.loaders:
+            raise ValueError(f"Unknown inference backend {backend!r}, expected one of {sorted(self.loaders)}")
+        return os.path.abspath(model_path or self.registry_config.default_model_path), backend
+
+    def _lookup(self, key):
+        # Caller holds self._lock
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+        return model
+
+    def get(self, model_path=None, backend=None):
+        """
+        Return the model of `model_path` (the default model when None) on `backend`
+        (the configured default when None), loading it once.
+        """
+        key = self._key(model_path, backend)
+        with self._lock:
+            model = self._lookup(key)
+            if model is not None:
+                return model
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                model = self._lookup(key)  # Loaded by another thread while this one waited
+                if model is not None:
+                    return model
+            try:
+                start = time.perf_counter()
+                model = self.loaders[key[1]](key[0])
+                logging.info(f"Loaded model {key[0]} ({key[1]}) in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                raise CustomException(e, sys)
+
+            with self._lock:
+                self._models[key] = model
+                self._loading.pop(key, None)
+                self.load_count += 1
+                while len(self._models) > self.registry_config.max_models:
+                    evicted, _ = self._models.popitem(last=False)
+                    logging.info(f"Dropped model {evicted} from the registry")
+            return model
+
+    def warm_up(self, model_paths=None, backend=None, text=WARM_UP_TEXT):
+        """
+        Load the given models (the default one when None) and run one forward pass on each,
+        so the first real request pays neither the load nor the first-call setup.
+        Returns {model path: seconds spent}.
+        """
+        timings = {}
+        for model_path in model_paths or [None]:
+            start = time.perf_counter()
+            model = self.get(model_path, backend)
+            try:
+                model(text)
+            except Exception as e:
+                raise CustomException(e, sys)
+            timings[self._key(model_path, backend)[0]] = round(time.perf_counter() - start, 3)
+        return timings
+
+    def loaded(self):
+        """(model path, backend) pairs currently held, least recently used first."""
+        with self._lock:
+            return list(self._models)
+
+    def evict(self, model_path=None, backend=None):
+        with self._lock:
+            return self._models.pop(self._key(model_path, backend), None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """The process-wide registry shared by every MetadataExtractionPipeline that is not given one."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry()
+        return _default_registry
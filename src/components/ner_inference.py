@@ -0,0 +1,166 @@
+import sys
+from dataclasses import dataclass
+import numpy as np
+from src.exception import CustomException
+
+
+@dataclass
+class BatchedNERConfig:
+    batch_size: int = 8  # Windows per forward pass
+    ignore_labels: tuple = ("O",)  # Labels left out of the output, as the transformers pipeline does
+    max_length: int = None  # Tokens per window; the tokenizer's model_max_length when None
+    stride: int = 128  # Tokens shared by consecutive windows of a long text; None truncates long texts instead
+
+
+def _softmax(logits):
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    scores = np.exp(shifted)
+    return scores / scores.sum(axis=-1, keepdims=True)
+
+
+def _collect_tokens(tokens, input_ids, offsets, special_tokens_mask, scores):
+    """
+    Add the predictions of one window to `tokens` ((start, end) character offsets -> prediction).
+    A token seen in several overlapping windows keeps the prediction of the window where it sits
+    farthest from the window's edges, i.e. with the most context on both sides.
+    """
+    positions = [index for index, special in enumerate(special_tokens_mask) if not special]
+    if not positions:
+        return
+    first, last = positions[0], positions[-1]
+    for index in positions:
+        context = min(index - first, last - index)
+        key = tuple(offsets[index])
+        if key not in tokens or context > tokens[key][0]:
+            tokens[key] = (context, int(input_ids[index]), scores[index])
+
+
+def _entities(tokenizer, id2label, tokens, ignore_labels):
+    """
+    Entities of one text from its reconciled tokens, in the format of pipeline("ner")(text).
+    Tokens are numbered in text order from 1, as in a single window after [CLS].
+    """
+    entities = []
+    for index, (start, end) in enumerate(sorted(tokens), start=1):
+        _, token_id, scores = tokens[(start, end)]
+        label_id = int(scores.argmax())
+        label = id2label[label_id]
+        if label in ignore_labels:
+            continue
+        entities.append({
+            "entity": label,
+            "score": scores[label_id],
+            "index": index,
+            "word": tokenizer.convert_ids_to_tokens(token_id),
+            "start": start,
+            "end": end,
+        })
+    return entities
+
+
+def _logits(ner_pipeline, batch):
+    """Logits (batch, sequence, labels) of one padded numpy batch, on the torch model or ONNX Runtime."""
+    if isinstance(ner_pipeline, OnnxNERPipeline):
+        return ner_pipeline.logits(batch)
+    import torch
+    model = ner_pipeline.model
+    model.eval()
+    with torch.inference_mode():
+        inputs = {name: torch.from_numpy(values).to(model.device) for name, values in batch.items()}
+        return model(**inputs).logits.float().cpu().numpy()
+
+
+def batched_ner(ner_pipeline, texts, config: BatchedNERConfig = None):
+    """
+    Run token classification over many texts in length-sorted micro-batches.
+    - Texts longer than one window are split into overlapping windows (`stride` shared tokens)
+      from the fast tokenizer's overflow, and their windows join the same batches as other texts
+    - Windows are tokenized once without padding, sorted by token count and padded only to the
+      longest window of their micro-batch, so short texts do not pay for long ones
+    - Predictions of overlapping windows are reconciled per token by character offset
+    Works with a transformers NER pipeline (torch) and with an OnnxNERPipeline.
+    Returns one entity list per text, in input order; a text that fits in one window gets
+    exactly what ner_pipeline(text) returns.
+    """
+    config = config or BatchedNERConfig()
+    try:
+        tokenizer = ner_pipeline.tokenizer
+        id2label = ner_pipeline.config.id2label if isinstance(ner_pipeline, OnnxNERPipeline) else ner_pipeline.model.config.id2label
+        truncation = bool(tokenizer.model_max_length and tokenizer.model_max_length > 0)  # As the pipeline tokenizes
+        windowed = truncation and config.stride is not None
+        stride = 0
+        if windowed:
+            # Windows must advance: at most half of a window's text tokens are shared
+            window_tokens = (config.max_length or tokenizer.model_max_length) - tokenizer.num_special_tokens_to_add()
+            stride = min(config.stride, window_tokens // 2)
+        encodings = tokenizer(
+            list(texts),
+            truncation=truncation,
+            max_length=config.max_length if truncation else None,
+            stride=stride,
+            return_overflowing_tokens=windowed,
+            return_special_tokens_mask=True,
+            return_offsets_mapping=True,
+        )
+        # Window -> text it was cut from
+        window_texts = encodings["overflow_to_sample_mapping"] if windowed else list(range(len(texts)))
+        model_inputs = [name for name in tokenizer.model_input_names if name in encodings]
+        # Padding pre-tokenized inputs is intended here, as in transformers' data collators
+        tokenizer.deprecation_warnings["Asking-to-pad-a-fast-tokenizer"] = True
+
+        order = sorted(range(len(window_texts)), key=lambda w: len(encodings["input_ids"][w]))
+        tokens = [{} for _ in texts]  # Per text: (start, end) -> (context, token id, scores)
+        for start in range(0, len(order), config.batch_size):
+            batch_windows = order[start:start + config.batch_size]
+            batch = tokenizer.pad(
+                {name: [encodings[name][w] for w in batch_windows] for name in model_inputs},
+                padding="longest",
+                return_tensors="np",
+            )
+            logits = _logits(ner_pipeline, dict(batch))
+
+            for row, w in enumerate(batch_windows):
+                # Padding positions are dropped here
+                length = len(encodings["input_ids"][w])
+                first = logits.shape[1] - length if tokenizer.padding_side == "left" else 0
+                _collect_tokens(
+                    tokens[window_texts[w]],
+                    encodings["input_ids"][w],
+                    encodings["offset_mapping"][w],
+                    encodings["special_tokens_mask"][w],
+                    _softmax(logits[row, first:first + length]),
+                )
+        return [_entities(tokenizer, id2label, text_tokens, config.ignore_labels) for text_tokens in tokens]
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+class OnnxNERPipeline:
+    """
+    NER on an ONNX export of the fine-tuned model (see ModelExporter), run with ONNX Runtime on CPU.
+    Called with a text it returns the same entity list as pipeline("ner"); batched_ner
+    accepts it in place of the transformers pipeline.
+    """
+
+    def __init__(self, model_path, onnx_path, intra_op_threads=None):
+        try:
+            import onnxruntime
+            from transformers import AutoConfig, AutoTokenizer
+            self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+            self.config = AutoConfig.from_pretrained(model_path)
+
+            options = onnxruntime.SessionOptions()
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if intra_op_threads:
+                options.intra_op_num_threads = intra_op_threads
+            self.session = onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+            self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def logits(self, batch):
+        feeds = {name: batch[name].astype(np.int64) for name in self.input_names}
+        return self.session.run(["logits"], feeds)[0]
+
+    def __call__(self, text):
+        return batched_ner(self, [text])[0]
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import logging
+
+
+@dataclass
+class ResultCacheConfig:
+    cache_dir: str = os.path.join('artifacts', 'cache')
+    max_bytes: int = 256 * 1024 * 1024  # Least recently used entries are evicted above this size
+    evict_to: float = 0.9  # Eviction frees space down to this share of max_bytes, so it runs only now and then
+
+
+def document_digest(pdf) -> str:
+    """SHA-256 of a PDF given as a path or as raw bytes."""
+    if isinstance(pdf, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(pdf).hexdigest()
+    digest = hashlib.sha256()
+    with open(pdf, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of extraction results.
+    Entries live in <cache_dir>/<namespace>/<sha256>.json, where the namespace carries the
+    extractor name and version, so a version bump never serves stale results.
+    The file mtime is the LRU clock: hits touch the entry, and the oldest entries are
+    removed once the cache grows beyond max_bytes.
+    The total size is measured once, then kept up to date by put(), so a store does not
+    scan the directory; only eviction does, which also resyncs the total with entries
+    written by other processes sharing the directory.
+    """
+
+    def __init__(self, config: ResultCacheConfig = None):
+        self.cache_config = config or ResultCacheConfig()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Size of all entries, measured on the first put
+        os.makedirs(self.cache_config.cache_dir, exist_ok=True)
+
+    def _entry_path(self, namespace, digest):
+        return os.path.join(self.cache_config.cache_dir, namespace, f"{digest}.json")
+
+    def get(self, namespace, digest):
+        """Return the cached value, or None on a miss."""
+        path = self._entry_path(namespace, digest)
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, namespace, digest, value):
+        """Store a JSON-serialisable value, then evict old entries if over budget."""
+        try:
+            path = self._entry_path(namespace, digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with self._lock:
+                if self._total_bytes is None:
+                    self._total_bytes = sum(size for _, size, _ in self._entries())
+            try:
+                replaced_bytes = os.path.getsize(path)
+            except OSError:
+                replaced_bytes = 0
+            # Write to a temp file first so readers never see a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(value, f)
+            os.replace(temp_path, path)
+            written_bytes = os.path.getsize(path)
+
+            with self._lock:
+                self._total_bytes += written_bytes - replaced_bytes
+                over_budget = self._total_bytes > self.cache_config.max_bytes
+            if over_budget:
+                self.evict()
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _entries(self):
+        """(mtime, size, path) of every entry, read from the directory."""
+        entries = []
+        for root, _, files in os.walk(self.cache_config.cache_dir):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in evict_to * max_bytes."""
+        entries = self._entries()
+        total_bytes = sum(size for _, size, _ in entries)
+        if total_bytes <= self.cache_config.max_bytes:
+            target_bytes = total_bytes  # Over budget only in this process's count, e.g. after another process evicted
+        else:
+            target_bytes = self.cache_config.max_bytes * self.cache_config.evict_to
+        for _, size, path in sorted(entries):
+            if total_bytes <= target_bytes:
+                break
+            try:
+                os.remove(path)
+                total_bytes -= size
+                logging.info(f"Evicted cache entry {path}")
+            except OSError:
+                pass
+        with self._lock:
+            self._total_bytes = total_bytes
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,156 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from src.exception import CustomException
+
+
+class StageRecord:
+    """Totals of one pipeline stage (e.g. an extractor), accumulated over its runs."""
+    __slots__ = ("calls", "wall_seconds", "cpu_seconds", "pages", "spans")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.pages = 0  # Pages visited by the stage
+        self.spans = 0  # Text spans on those pages
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "pages": self.pages,
+            "spans": self.spans,
+        }
+
+
+class Instrumentation:
+    """
+    Per-document timings and counters.
+    - stage(name): context manager recording wall time, CPU time, pages and spans of a stage
+    - count(name): plain counters, e.g. get_text calls
+    - gauge(name, value): high-water marks, e.g. peak RSS; merging keeps the maximum
+    Readable as a dict (to_dict) and exportable as Prometheus text or JSON lines.
+    CPU time is the process CPU time, so stages running on other processes report their own.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        record = StageRecord()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record  # The stage fills in record.pages / record.spans
+        finally:
+            record.calls = 1
+            record.wall_seconds = time.perf_counter() - start_wall
+            record.cpu_seconds = time.process_time() - start_cpu
+            self.add_stage(name, record)
+
+    def add_stage(self, name, record):
+        with self._lock:
+            total = self.stages.setdefault(name, StageRecord())
+            total.calls += record.calls
+            total.wall_seconds += record.wall_seconds
+            total.cpu_seconds += record.cpu_seconds
+            total.pages += record.pages
+            total.spans += record.spans
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = max(self.gauges.get(name, value), value)
+
+    def merge(self, metrics):
+        """Add the totals of another Instrumentation, or of its to_dict() output."""
+        if isinstance(metrics, Instrumentation):
+            metrics = metrics.to_dict()
+        for name, values in metrics.get("stages", {}).items():
+            record = StageRecord()
+            for field in StageRecord.__slots__:
+                setattr(record, field, values.get(field, 0))
+            self.add_stage(name, record)
+        for name, value in metrics.get("counters", {}).items():
+            self.count(name, value)
+        for name, value in metrics.get("gauges", {}).items():
+            self.gauge(name, value)
+        return self
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "stages": {name: record.to_dict() for name, record in self.stages.items()},
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def to_prometheus(self, prefix="format_verifier", labels=None):
+        """Prometheus text exposition format; stages become a `stage` label."""
+        return metrics_to_prometheus(self.to_dict(), prefix, labels)
+
+    def write_jsonl(self, path, **fields):
+        """Append the metrics as one JSON line, next to identifying fields such as the document."""
+        write_metrics_jsonl(path, self.to_dict(), **fields)
+
+
+def metrics_to_prometheus(metrics, prefix="format_verifier", labels=None):
+    base_labels = dict(labels or {})
+    lines = []
+
+    def label_text(extra):
+        merged = {**base_labels, **extra}
+        if not merged:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in merged.values())
+        return "{" + ",".join(f'{key}="{value}"' for key, value in zip(merged, escaped)) + "}"
+
+    for field, metric_type in (("calls", "counter"), ("wall_seconds", "counter"), ("cpu_seconds", "counter"),
+                               ("pages", "counter"), ("spans", "counter")):
+        name = f"{prefix}_stage_{field}_total"
+        lines.append(f"# TYPE {name} {metric_type}")
+        for stage, values in metrics.get("stages", {}).items():
+            lines.append(f"{name}{label_text({'stage': stage})} {values[field]}")
+
+    for counter, value in metrics.get("counters", {}).items():
+        name = f"{prefix}_{counter}_total"
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{label_text({})} {value}")
+
+    for gauge, value in metrics.get("gauges", {}).items():
+        name = f"{prefix}_{gauge}"
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name}{label_text({})} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)  # Bytes on macOS, KiB on Linux
+    except ImportError:
+        import psutil  # Windows has no resource module
+        memory = psutil.Process().memory_info()
+        return round(getattr(memory, "peak_wset", memory.rss) / 1024 / 1024, 1)
+
+
+def write_metrics_jsonl(path, metrics, **fields):
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps({**fields, "timestamp": time.time(), **metrics}) + "\n")
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -0,0 +1,195 @@
+"""
+Batch format verification over many PDFs.
+
+    python -m src.pipelines.batch dataset/pdfs --template template.json --output artifacts/batch.jsonl
+
+Each document becomes one JSONL record with its compliance report, extracted format, timing
+and per-stage metrics.
+Documents already recorded successfully in the output file are skipped, so an interrupted
+run is resumed by running the same command again; failed documents are retried.
+A document whose worker dies (out of memory, a crash in MuPDF) gets an error record and the
+run goes on with a fresh pool.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import logging
+from src.components.result_cache import ResultCache, ResultCacheConfig
+from src.pipelines.format_verifier_pipeline import FormatVerifierPipeline
+
+
+@dataclass
+class BatchVerificationConfig:
+    output_path: str = os.path.join('artifacts', 'batch_verification.jsonl')
+    workers: int = max(1, (os.cpu_count() or 1) - 1)  # Documents verified in parallel
+    selective: bool = True  # Only extract the sections the template checks
+    cache_dir: str = None  # Optional ResultCache directory shared by all workers
+    low_memory: bool = False  # Page-at-a-time extraction, for documents that would not fit in a worker's memory
+
+
+def collect_pdf_paths(inputs):
+    """Expand directories (searched recursively) and glob patterns into a sorted list of PDF paths."""
+    pdf_paths = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '**', '*.pdf')
+        for path in glob.glob(pattern, recursive=True):
+            if os.path.isfile(path) and path.lower().endswith('.pdf'):
+                pdf_paths.add(os.path.abspath(path))
+    return sorted(pdf_paths)
+
+
+def load_completed(output_path):
+    """
+    Read the paths already verified successfully from a previous (possibly interrupted) run.
+    A partially written last line is cut off, so new records start on a fresh line.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+            logging.info(f"Dropped a partial record at the end of {output_path}")
+            data = data[:data.rfind(b'\n') + 1]
+
+    for line in data.decode('utf-8').splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("status") == "ok":
+            completed.add(record["pdf"])
+    return completed
+
+
+def verify_document(pdf_path, template, selective, cache_dir, low_memory=False):
+    """Worker: verify one PDF and return its JSONL record. Failures become error records."""
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    record = {"pdf": pdf_path}
+    try:
+        cache = ResultCache(ResultCacheConfig(cache_dir=cache_dir)) if cache_dir else None
+        pipeline = FormatVerifierPipeline(pdf_path, template, selective=selective, cache=cache, low_memory=low_memory)
+        compliance_report, extracted_format, metrics = pipeline.initiate_format_verification(return_metrics=True)
+        record.update(status="ok", compliance_report=compliance_report, extracted_format=extracted_format, metrics=metrics)
+    except Exception as e:
+        record.update(status="error", error=str(e))
+    record["timing"] = {
+        "wall_seconds": round(time.perf_counter() - start_wall, 3),
+        "cpu_seconds": round(time.process_time() - start_cpu, 3),
+    }
+    return record
+
+
+class BatchVerificationPipeline:
+    def __init__(self, template, config: BatchVerificationConfig = None):
+        self.template = template
+        self.batch_config = config or BatchVerificationConfig()
+
+    def run(self, pdf_paths):
+        """Verify all PDFs not yet in the output file, appending one record per document as it completes."""
+        try:
+            output_path = self.batch_config.output_path
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            completed = load_completed(output_path)
+            pending = [path for path in pdf_paths if path not in completed]
+            logging.info(f"Batch verification: {len(pending)} pending, {len(completed)} already done")
+
+            summary = {"ok": 0, "error": 0, "skipped": len(pdf_paths) - len(pending)}
+            with open(output_path, 'a') as output:
+                crashed = self.verify_paths(pending, self.batch_config.workers, output, summary)
+                # A worker died with these in flight: rerun them one at a time, so only the document
+                # that kills its worker is recorded as failed
+                for path in crashed:
+                    if self.verify_paths([path], 1, output, summary):
+                        self.write_record(output, summary, {
+                            "pdf": path, "status": "error", "error": "worker process died while verifying this document",
+                        })
+            return summary
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def verify_paths(self, paths, workers, output, summary):
+        """
+        Verify `paths` on `workers` processes, writing each record as it completes.
+        At most `workers` documents are in flight, so a dying worker only affects those: the pool is
+        rebuilt for the remaining paths, and the in-flight ones are returned without a record.
+        """
+        queue = list(reversed(paths))
+        crashed = []
+        while queue:
+            broken = False
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {}  # Future -> PDF path
+                while futures or (queue and not broken):
+                    while queue and not broken and len(futures) < workers:
+                        path = queue.pop()
+                        try:
+                            futures[executor.submit(verify_document, path, self.template, self.batch_config.selective,
+                                                    self.batch_config.cache_dir, self.batch_config.low_memory)] = path
+                        except BrokenProcessPool:
+                            queue.append(path)
+                            broken = True
+
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path = futures.pop(future)
+                        try:
+                            record = future.result()
+                        except BrokenProcessPool:
+                            crashed.append(path)
+                            broken = True
+                            continue
+                        except Exception as e:
+                            record = {"pdf": path, "status": "error", "error": str(e)}
+                        self.write_record(output, summary, record)
+            if broken:
+                logging.info(f"A verification worker died; restarting the pool for {len(queue)} remaining documents")
+        return crashed
+
+    def write_record(self, output, summary, record):
+        output.write(json.dumps(record, default=str) + '\n')
+        output.flush()  # Every finished document survives an interruption
+        summary[record["status"]] += 1
+        if record["status"] == "error":
+            logging.info(f"Verification failed for {record['pdf']}: {record['error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify the formatting of many PDFs against one template.")
+    parser.add_argument("inputs", nargs="+", help="Directories or glob patterns of PDFs")
+    parser.add_argument("--template", required=True, help="JSON file with the expected format")
+    parser.add_argument("--output", default=BatchVerificationConfig.output_path, help="JSONL file to append records to")
+    parser.add_argument("--workers", type=int, default=BatchVerificationConfig.workers)
+    parser.add_argument("--all-sections", action="store_true", help="Extract every section, not only the template's")
+    parser.add_argument("--cache-dir", default=None, help="Reuse extraction results across runs")
+    parser.add_argument("--low-memory", action="store_true", help="Process one page at a time with flat memory use")
+    args = parser.parse_args(argv)
+
+    with open(args.template, 'r') as f:
+        template = json.load(f)
+
+    pdf_paths = collect_pdf_paths(args.inputs)
+    config = BatchVerificationConfig(
+        output_path=args.output,
+        workers=args.workers,
+        selective=not args.all_sections,
+        cache_dir=args.cache_dir,
+        low_memory=args.low_memory,
+    )
+    summary = BatchVerificationPipeline(template, config).run(pdf_paths)
+    print(f"{len(pdf_paths)} documents: {summary['ok']} verified, {summary['error']} failed, {summary['skipped']} already done")
+    return 0 if summary["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
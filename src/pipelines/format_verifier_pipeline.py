@@ -2,25 +2,52 @@ import os
 import sys
 from src.components.extraction.format_extractor import FormatExtractor
 from src.exception import CustomException
-from src.components.extraction.format_verifier import generate_formatting_compliance_report
+from src.components.extraction.format_verifier import generate_formatting_compliance_report, iter_formatting_compliance_report
 
 class FormatVerifierPipeline:
-    def __init__(self, pdf_path, input_format):
+    def __init__(self, pdf, input_format, workers=1, selective=False, cache=None, sampling=None, low_memory=False):
         self.input_format = input_format
-        self.format_extractor = FormatExtractor(pdf_path)
+        self.format_extractor = FormatExtractor(pdf, workers=workers, cache=cache, sampling=sampling, low_memory=low_memory)
+        self.selective = selective  # Only extract the sections the template checks
         self.extracted_format = None
     
-    def initiate_format_verification(self):
+    def initiate_format_verification(self, return_metrics=False):
+        """
+        Returns (compliance_report, extracted_format), plus the extractor's per-document
+        metrics dict as a third element with return_metrics.
+        """
         try:
-            # Extract all the format from the pdf
-            self.extracted_format = self.format_extractor.extract_all()
+            # Extract the format from the pdf (only the template's sections when selective)
+            if self.selective:
+                self.extracted_format = self.format_extractor.extract(sections=list(self.input_format))
+            else:
+                self.extracted_format = self.format_extractor.extract_all()
 
             # Generate the compliance report
-            compliance_report = generate_formatting_compliance_report(self.input_format, self.extracted_format)
+            with self.format_extractor.instrumentation.stage("generate_formatting_compliance_report"):
+                compliance_report = generate_formatting_compliance_report(self.input_format, self.extracted_format)
+            if return_metrics:
+                return (compliance_report, self.extracted_format, self.format_extractor.metrics())
             return (compliance_report, self.extracted_format)
         except CustomException as e:
             raise CustomException(e,sys)
 
+    def iter_format_verification(self):
+        """
+        Streaming variant of initiate_format_verification.
+        Yields (section, verdicts, extracted_section) as each section is extracted and checked.
+        """
+        sections = list(self.input_format) if self.selective else None
+        self.extracted_format = {}
+
+        def extracted_sections():
+            for section, extracted_section in self.format_extractor.iter_extract(sections):
+                self.extracted_format[section] = extracted_section
+                yield section, extracted_section
+
+        for section, verdicts in iter_formatting_compliance_report(self.input_format, extracted_sections()):
+            yield section, verdicts, self.extracted_format[section]
+
 if __name__ == "__main__":
     pdf_path = os.path.join(os.getcwd(), "dataset", "pdfs", "toxicMeter.pdf")
     input_format = {
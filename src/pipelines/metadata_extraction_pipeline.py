@@ -1,41 +1,234 @@
 import os
 import sys
+import hashlib
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from src.exception import CustomException
-from transformers import pipeline, AutoTokenizer, AutoModelForTokenClassification
+from src.logger import logging
 from src.pipelines.utils import convert_ner_results, clean_pdf_text, extract_first_page_text, capitalize_metadata
 from src.components.extraction.utils import extract_metadata_llama
+from src.components.llm_client import get_llm_client, llm_client_identity
+from src.components.document_source import open_document
+from src.components.model_registry import get_model_registry
+from src.components.ner_inference import batched_ner
+from src.instrumentation import Instrumentation
+
+# Bump whenever the model or the post-processing changes, so older cached results are not reused
+METADATA_EXTRACTOR_VERSION = "2"
 
 
 class MetadataExtractionPipeline:
-    def  __init__(self):
-        pass
-    def extract(self,pdf):
+    """
+    BERT NER and LLM metadata of a PDF's cover page. The two models are independent, so they run
+    concurrently on the pipeline's own threads, each under its own deadline:
+    - bert_timeout: seconds for one (batched) NER run, None for no limit; missing it fails the call
+    - llm_timeout: seconds per LLM call; on a timeout or an error the LLM metadata is {"error": ...}
+      and the BERT metadata still comes back
+    llm_client is any object with a complete(prompt) -> str method (see src.components.llm_client).
+    """
+
+    def  __init__(self, cache=None, registry=None, model_path=None, backend=None,
+                  llm_client=None, bert_timeout=None, llm_timeout=60.0, llm_concurrency=4):
+        self.cache = cache  # Optional ResultCache; a hit skips opening the PDF and running the models
+        self.cache_namespace = f"metadata_extractor-v{METADATA_EXTRACTOR_VERSION}"
+        self.registry = registry or get_model_registry()  # Loads each model once per process
+        self.model_path = model_path  # Fine-tuned BERT directory; the registry's default when None
+        self.backend = backend or self.registry.registry_config.backend  # "torch", "onnx" or "onnx-int8"
+        if model_path is not None:
+            self.cache_namespace += f"-{os.path.basename(os.path.normpath(model_path))}"
+        if self.backend != "torch":
+            self.cache_namespace += f"-{self.backend}"  # Quantized models may tag a few tokens differently
+        self.llm_client = llm_client  # The process-wide default client when None
+        # Cached entries hold the LLM answer too, so another model or server must not reuse them
+        llm_identity = llm_client_identity(llm_client or get_llm_client())
+        self.cache_namespace += f"-llm-{hashlib.sha256(llm_identity.encode()).hexdigest()[:12]}"
+        self.bert_timeout = bert_timeout
+        self.llm_timeout = llm_timeout
+        self.llm_concurrency = llm_concurrency  # LLM calls in flight at once for a batch
+        self._executors = None  # (bert, llm) thread pools, created on first use
+        self._executors_lock = threading.Lock()
+
+    @property
+    def ner_pipeline(self):
+        # Served by the registry, so every pipeline instance of the process shares one loaded model
+        return self.registry.get(self.model_path, self.backend)
+
+    def load_model(self):
+        """Warm-up hook: load the model and run one forward pass ahead of the first document."""
+        self.registry.warm_up([self.model_path], self.backend)
+        return self.ner_pipeline
+
+    def extract(self,pdf,return_metrics=False):
+        """
+        Returns (bert_metadata, llama_metadata), or (bert_metadata, llama_metadata, metrics)
+        with return_metrics, where metrics is this document's Instrumentation dict.
+        """
+        try:
+            instrumentation = Instrumentation()  # Per call: a long-lived pipeline serves many documents
+            pdf = open_document(pdf)  # Reuses the handle when the caller passes a DocumentSource
+            digest = None
+            result = None
+            if self.cache is not None:
+                with instrumentation.stage("cache_lookup"):
+                    digest = pdf.digest
+                    cached = self.cache.get(self.cache_namespace, digest)
+                if cached is not None:
+                    instrumentation.count("cache_hits")
+                    result = (metadata_from_json(cached["bert"]), cached["llama"])
+
+            if result is None:
+                result = self.extract_uncached(pdf, instrumentation)
+                bert_structured_metadata, llama_metadata = result
+
+                # LLM failures are not cached so that a later run can retry them
+                if self.cache is not None and "error" not in llama_metadata:
+                    with instrumentation.stage("cache_store"):
+                        self.cache.put(self.cache_namespace, digest, {
+                            "bert": metadata_to_json(bert_structured_metadata),
+                            "llama": llama_metadata,
+                        })
+
+            if return_metrics:
+                return (*result, instrumentation.to_dict())
+            return result
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def extract_batch(self,pdfs,return_metrics=False,batch_config=None):
+        """
+        Metadata of many PDFs, with BERT NER run over all of them in length-sorted micro-batches.
+        Returns a list of (bert_metadata, llama_metadata) in input order, plus the batch's
+        metrics dict with return_metrics. batch_config is an optional BatchedNERConfig.
+        """
+        try:
+            instrumentation = Instrumentation()
+            sources = [open_document(pdf) for pdf in pdfs]
+            results = [None] * len(sources)
+            digests = [None] * len(sources)
+            if self.cache is not None:
+                with instrumentation.stage("cache_lookup"):
+                    for i, source in enumerate(sources):
+                        digests[i] = source.digest
+                        cached = self.cache.get(self.cache_namespace, digests[i])
+                        if cached is not None:
+                            instrumentation.count("cache_hits")
+                            results[i] = (metadata_from_json(cached["bert"]), cached["llama"])
+
+            pending = [i for i, result in enumerate(results) if result is None]
+            if pending:
+                with instrumentation.stage("extract_first_page_text") as record:
+                    texts = [clean_pdf_text(extract_first_page_text(sources[i])) for i in pending]
+                    record.pages = len(pending)
+                instrumentation.count("get_text_calls", len(pending))
+                bert_metadata, llama_metadata = self.extract_models(texts, batch_config, instrumentation)
+
+                for i, bert_structured_metadata, llama_structured_metadata in zip(pending, bert_metadata, llama_metadata):
+                    results[i] = (bert_structured_metadata, llama_structured_metadata)
+                    if self.cache is not None and "error" not in llama_structured_metadata:
+                        with instrumentation.stage("cache_store"):
+                            self.cache.put(self.cache_namespace, digests[i], {
+                                "bert": metadata_to_json(bert_structured_metadata),
+                                "llama": llama_structured_metadata,
+                            })
+
+            if return_metrics:
+                return results, instrumentation.to_dict()
+            return results
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def bert_metadata_batch(self,texts,batch_config=None,instrumentation=None):
+        """Structured BERT metadata of many cleaned first-page texts, from one batched NER run."""
+        try:
+            instrumentation = instrumentation or Instrumentation()
+            with instrumentation.stage("load_model"):
+                ner_pipeline = self.ner_pipeline
+            with instrumentation.stage("bert_ner"):
+                bert_results = batched_ner(ner_pipeline, texts, batch_config)
+            return [capitalize_metadata(convert_ner_results(bert_result)) for bert_result in bert_results]
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def extract_models(self,texts,batch_config=None,instrumentation=None):
+        """
+        (BERT metadata, LLM metadata) lists of many cleaned first-page texts: one batched NER run
+        and one LLM call per text, all running concurrently under their deadlines.
+        Must not be called from a thread running an event loop.
+        """
+        try:
+            instrumentation = instrumentation or Instrumentation()
+            return asyncio.run(self._extract_models(texts, batch_config, instrumentation))
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    async def _extract_models(self, texts, batch_config, instrumentation):
+        bert_executor, llm_executor = self._get_executors()
+        loop = asyncio.get_running_loop()
+        bert = loop.run_in_executor(bert_executor, self.bert_metadata_batch, texts, batch_config, instrumentation)
+        llm = [self._llm_metadata(loop, llm_executor, text, instrumentation) for text in texts]
+        llama_metadata = asyncio.gather(*llm)
         try:
-            bert_model_path = os.path.join(os.getcwd(),'artifacts',"fine_tuned_bert_ner")
-            # Load fine-tuned model and tokenizer
-            tokenizer = AutoTokenizer.from_pretrained(bert_model_path)
-            model = AutoModelForTokenClassification.from_pretrained(bert_model_path)
-        
-            # Create NER pipeline
-            ner_pipeline = pipeline("ner", model=model, tokenizer=tokenizer)
+            bert_metadata = await asyncio.wait_for(bert, self.bert_timeout)
+        except asyncio.TimeoutError:
+            llama_metadata.cancel()
+            instrumentation.count("bert_timeouts")
+            raise TimeoutError(f"BERT NER did not finish within {self.bert_timeout}s")
+        except Exception:
+            llama_metadata.cancel()
+            raise
+        return bert_metadata, await llama_metadata
+
+    async def _llm_metadata(self, loop, executor, text, instrumentation):
+        """LLM metadata of one text, or {"error": ...} when the call fails or misses llm_timeout."""
+        with instrumentation.stage("llama_llm"):
+            call = loop.run_in_executor(executor, extract_metadata_llama, text, self.llm_client)
+            try:
+                return await asyncio.wait_for(call, self.llm_timeout)
+            except asyncio.TimeoutError:
+                instrumentation.count("llm_timeouts")
+                logging.info(f"LLM metadata extraction timed out after {self.llm_timeout}s")
+                return {"error": f"LLM did not answer within {self.llm_timeout}s"}
+            except Exception as e:
+                instrumentation.count("llm_errors")
+                logging.info(f"LLM metadata extraction failed: {e}")
+                return {"error": f"LLM request failed: {e}"}
+
+    def _get_executors(self):
+        # Own pools rather than the loop's default one: asyncio.run waits for the default pool
+        # on exit, which would hold the caller until a timed-out LLM call returns
+        with self._executors_lock:
+            if self._executors is None:
+                self._executors = (
+                    ThreadPoolExecutor(max_workers=1, thread_name_prefix="metadata-bert"),
+                    ThreadPoolExecutor(max_workers=self.llm_concurrency, thread_name_prefix="metadata-llm"),
+                )
+            return self._executors
+
+    def close(self):
+        """Stop the model threads; calls still running are not waited for."""
+        with self._executors_lock:
+            if self._executors is not None:
+                for executor in self._executors:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                self._executors = None
+
+    def extract_uncached(self,pdf,instrumentation=None):
+        try:
+            instrumentation = instrumentation or Instrumentation()
 
             # Predict entities
             #text = "Under the Supervision of Mr. Nabaraj Bahadur Negi Lecturer Submitted by: Dipesh Ghimire (199), Rabin Pant (200), Prabin Raj Amatya (201) Submitted To: Tribhuvan University February 2025"
-            pdf_text = extract_first_page_text(pdf)
-            cleaned_text = clean_pdf_text(pdf_text)
-            bert_result = ner_pipeline(cleaned_text)
-
-            # Convert NER results to structured metadata
-            bert_structured_metadata = {'Author': {'rabin pant', 'prabin raj amatya', 'dipesh ghimire'}, 
-                                        'Roll number': {'199', '201', '200'}, 
-                                        'Organization': 'tribhuvan university', 
-                                        'Supervisor': 'mr. nabaraj bahadur negi', 
-                                        'Submission Date': 'february 2025'}
-            bert_metadata = convert_ner_results(bert_result)
-            bert_structured_metadata = capitalize_metadata(bert_metadata)
-            # Extract metadata using Llama 2
-            llama_metadata = extract_metadata_llama(cleaned_text)
+            with instrumentation.stage("extract_first_page_text") as record:
+                pdf_text = extract_first_page_text(pdf)
+                cleaned_text = clean_pdf_text(pdf_text)
+                record.pages = 1
+            instrumentation.count("get_text_calls")
+
+            # BERT NER (long pages run as overlapping windows) and Llama 2 run concurrently
+            bert_metadata, llama_metadata = self.extract_models([cleaned_text], instrumentation=instrumentation)
+            bert_structured_metadata, llama_metadata = bert_metadata[0], llama_metadata[0]
             # llama_metadata ={"Metadata": {
             #                     "Author": ["Dipesh Ghimire", "Rajesh Adhikari", "Sijan B.K."],
             #                     "Organization": ["Department of Information Technology", "Amrit Campus Lainchaur, Kathmandu"],
@@ -44,11 +237,18 @@ class MetadataExtractionPipeline:
             #                     "Submission Date": ["February 2025"]
             #                             }
             #                 }
-            
+
             return (bert_structured_metadata,llama_metadata)
         except Exception as e:
             raise CustomException(e,sys)
 
+def metadata_to_json(metadata):
+    """Sets (authors, roll numbers) become sorted lists so the metadata can be stored as JSON."""
+    return {key: sorted(value) if isinstance(value, set) else value for key, value in metadata.items()}
+
+def metadata_from_json(metadata):
+    return {key: set(value) if isinstance(value, list) else value for key, value in metadata.items()}
+
 if __name__ == "__main__":
     me_pipeline = MetadataExtractionPipeline()
     me_pipeline.extract("")
\ No newline at end of file
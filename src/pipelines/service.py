@@ -0,0 +1,282 @@
+"""
+Long-lived local verification service.
+
+    python -m src.pipelines.service --port 8765 --workers 4
+
+Models are loaded once at startup and format extraction runs on a warm, bounded process pool,
+so requests do not pay the cold-start cost of building the pipelines.
+
+Endpoints (multipart form with a `pdf` file field):
+- POST /verify    fields: pdf, template (JSON), selective ("true"/"false", optional)
+                  -> {"compliance_report": ..., "extracted_format": ...}
+- POST /metadata  fields: pdf -> {"bert": ..., "llama": ...}
+                  "llama" is {"error": ...} when the LLM fails or misses its deadline
+- GET  /status    -> running / queued jobs per endpoint
+- GET  /metrics   -> per-stage timings and counters of all requests, in Prometheus text format
+When an endpoint's queue is full the service answers 429 with a Retry-After header.
+Every response carries the current queue depth in the X-Queue-Depth header.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+from aiohttp import web
+from src.exception import CustomException
+from src.logger import logging
+from src.components.llm_client import LLMClientConfig, create_llm_client
+from src.components.result_cache import ResultCache, ResultCacheConfig
+from src.components.extraction.format_extractor import SECTION_EXTRACTORS
+from src.components.extraction.format_verifier import TEMPLATE_REQUIRED_KEYS
+from src.instrumentation import Instrumentation, write_metrics_jsonl
+from src.pipelines.format_verifier_pipeline import FormatVerifierPipeline
+from src.pipelines.metadata_extraction_pipeline import MetadataExtractionPipeline, metadata_to_json
+
+
+@dataclass
+class ServiceConfig:
+    host: str = "127.0.0.1"  # Local only
+    port: int = 8765
+    workers: int = max(1, (os.cpu_count() or 1) - 1)  # Process pool size for format verification
+    metadata_threads: int = 1  # Threads sharing the single warm BERT model
+    max_queue: int = 16  # Jobs allowed to wait per endpoint before answering 429
+    max_upload_bytes: int = 64 * 1024 * 1024
+    cache_dir: Optional[str] = None  # Optional ResultCache directory
+    metrics_jsonl: Optional[str] = None  # Optional file receiving one metrics line per request
+    low_memory: bool = False  # Page-at-a-time extraction with flat memory use per worker
+    ner_backend: str = "torch"  # BERT inference backend: torch, onnx or onnx-int8
+    bert_timeout: Optional[float] = None  # Seconds for BERT NER per request; None for no limit
+    llm_timeout: float = 60.0  # Seconds for the LLM per request, after which BERT metadata is returned alone
+    llm_base_url: Optional[str] = None  # OpenAI-compatible LLM server; Together AI when None
+    llm_model: str = LLMClientConfig.model
+
+
+class JobQueue:
+    """Admission control for one executor: `slots` running jobs plus at most `max_queue` waiting ones."""
+
+    def __init__(self, slots, max_queue):
+        self.slots = slots
+        self.max_queue = max_queue
+        self.pending = 0  # Running + waiting jobs
+
+    @property
+    def running(self):
+        return min(self.pending, self.slots)
+
+    @property
+    def queued(self):
+        return max(0, self.pending - self.slots)
+
+    def try_admit(self):
+        if self.pending >= self.slots + self.max_queue:
+            return False
+        self.pending += 1
+        return True
+
+    def release(self):
+        self.pending -= 1
+
+    def status(self):
+        return {"running": self.running, "queued": self.queued, "capacity": self.slots + self.max_queue}
+
+
+def _warm_worker():
+    """Process-pool no-op: forces the worker to start and import the extraction modules."""
+    return os.getpid()
+
+
+def _template_error(template):
+    """Why a template cannot be checked, or None when it can."""
+    if not isinstance(template, dict):
+        return "'template' must be a JSON object"
+    unknown = sorted(set(template) - set(SECTION_EXTRACTORS))
+    if unknown:
+        return f"unknown template sections {unknown}, expected some of {list(SECTION_EXTRACTORS)}"
+    for section, values in template.items():
+        if not isinstance(values, dict):
+            return f"template section '{section}' must be a JSON object"
+        missing = [key for key in TEMPLATE_REQUIRED_KEYS.get(section, ()) if key not in values]
+        if missing:
+            return f"template section '{section}' is missing {missing}"
+    return None
+
+
+def _verify_pdf(data, template, selective, cache_dir, low_memory=False):
+    """
+    Process-pool worker: format verification of an in-memory PDF.
+    Errors are returned as {"error": ...}, since CustomException does not survive unpickling.
+    """
+    try:
+        cache = ResultCache(ResultCacheConfig(cache_dir=cache_dir)) if cache_dir else None
+        pipeline = FormatVerifierPipeline(data, template, selective=selective, cache=cache, low_memory=low_memory)
+        compliance_report, extracted_format, metrics = pipeline.initiate_format_verification(return_metrics=True)
+        return {"compliance_report": compliance_report, "extracted_format": extracted_format, "metrics": metrics}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+class VerificationService:
+    def __init__(self, config: ServiceConfig = None):
+        self.service_config = config or ServiceConfig()
+        cache = ResultCache(ResultCacheConfig(cache_dir=self.service_config.cache_dir)) if self.service_config.cache_dir else None
+        llm_client = create_llm_client(LLMClientConfig(
+            model=self.service_config.llm_model,
+            base_url=self.service_config.llm_base_url,
+            timeout=self.service_config.llm_timeout,
+        ))
+        if not self.service_config.llm_base_url and not os.environ.get("TOGETHER_API_KEY"):
+            # Not fatal: /verify and the BERT metadata still work, and "llama" reports the missing key
+            logging.info("No TOGETHER_API_KEY and no --llm-base-url: LLM metadata requests will fail")
+        self.metadata_pipeline = MetadataExtractionPipeline(
+            cache=cache, backend=self.service_config.ner_backend, llm_client=llm_client,
+            bert_timeout=self.service_config.bert_timeout, llm_timeout=self.service_config.llm_timeout,
+        )
+        self.queues = {
+            "verify": JobQueue(self.service_config.workers, self.service_config.max_queue),
+            "metadata": JobQueue(self.service_config.metadata_threads, self.service_config.max_queue),
+        }
+        self.process_pool = None
+        self.metadata_executor = None
+        self.instrumentation = Instrumentation()  # Totals over all requests, served on /metrics
+
+    def record_metrics(self, endpoint, metrics):
+        self.instrumentation.merge(metrics)
+        if self.service_config.metrics_jsonl:
+            write_metrics_jsonl(self.service_config.metrics_jsonl, metrics, endpoint=endpoint)
+
+    def queue_depth(self):
+        return sum(queue.queued for queue in self.queues.values())
+
+    async def on_startup(self, app):
+        loop = asyncio.get_running_loop()
+        self.process_pool = ProcessPoolExecutor(max_workers=self.service_config.workers)
+        self.metadata_executor = ThreadPoolExecutor(max_workers=self.service_config.metadata_threads)
+
+        # Load the model and start every worker up front, so the first request is already warm
+        await loop.run_in_executor(self.metadata_executor, self.metadata_pipeline.load_model)
+        await asyncio.gather(*[
+            loop.run_in_executor(self.process_pool, _warm_worker) for _ in range(self.service_config.workers)
+        ])
+        logging.info(f"Verification service ready with {self.service_config.workers} workers")
+
+    async def on_cleanup(self, app):
+        self.process_pool.shutdown(cancel_futures=True)
+        self.metadata_executor.shutdown(cancel_futures=True)
+        self.metadata_pipeline.close()
+
+    @web.middleware
+    async def queue_depth_middleware(self, request, handler):
+        try:
+            response = await handler(request)
+        except web.HTTPException as e:
+            e.headers["X-Queue-Depth"] = str(self.queue_depth())
+            raise
+        response.headers["X-Queue-Depth"] = str(self.queue_depth())
+        return response
+
+    async def run_job(self, name, executor, function, *args):
+        """Run a job on an executor, or answer 429 when the endpoint's queue is full."""
+        queue = self.queues[name]
+        if not queue.try_admit():
+            raise web.HTTPTooManyRequests(
+                text=json.dumps({"error": f"{name} queue is full", **queue.status()}),
+                content_type="application/json",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+        finally:
+            queue.release()
+
+    async def read_form(self, request):
+        form = await request.post()
+        pdf = form.get("pdf")
+        if pdf is None or not hasattr(pdf, "file"):
+            raise web.HTTPBadRequest(text=json.dumps({"error": "missing 'pdf' file field"}), content_type="application/json")
+        return form, pdf.file.read()
+
+    async def verify(self, request):
+        form, data = await self.read_form(request)
+        try:
+            template = json.loads(form.get("template", ""))
+        except ValueError:
+            template = None
+        error = _template_error(template)
+        if error:
+            raise web.HTTPBadRequest(text=json.dumps({"error": error}), content_type="application/json")
+        selective = str(form.get("selective", "false")).lower() == "true"
+
+        result = await self.run_job(
+            "verify", self.process_pool, _verify_pdf, data, template, selective,
+            self.service_config.cache_dir, self.service_config.low_memory,
+        )
+        if "error" in result:
+            logging.info(f"Verification failed: {result['error']}")
+            return web.json_response(result, status=500)
+        self.record_metrics("verify", result["metrics"])
+        return web.json_response(result, dumps=lambda value: json.dumps(value, default=str))
+
+    async def metadata(self, request):
+        _, data = await self.read_form(request)
+        try:
+            bert_metadata, llama_metadata, metrics = await self.run_job(
+                "metadata", self.metadata_executor, self.metadata_pipeline.extract, data, True
+            )
+        except CustomException as e:
+            logging.info(f"Metadata extraction failed: {e}")
+            return web.json_response({"error": str(e)}, status=500)
+        self.record_metrics("metadata", metrics)
+        return web.json_response({"bert": metadata_to_json(bert_metadata), "llama": llama_metadata, "metrics": metrics})
+
+    async def status(self, request):
+        return web.json_response({name: queue.status() for name, queue in self.queues.items()})
+
+    async def metrics(self, request):
+        return web.Response(text=self.instrumentation.to_prometheus(), content_type="text/plain")
+
+    def create_app(self):
+        app = web.Application(client_max_size=self.service_config.max_upload_bytes, middlewares=[self.queue_depth_middleware])
+        app.add_routes([
+            web.post("/verify", self.verify),
+            web.post("/metadata", self.metadata),
+            web.get("/status", self.status),
+            web.get("/metrics", self.metrics),
+        ])
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the local format verification service.")
+    parser.add_argument("--host", default=ServiceConfig.host)
+    parser.add_argument("--port", type=int, default=ServiceConfig.port)
+    parser.add_argument("--workers", type=int, default=ServiceConfig.workers)
+    parser.add_argument("--max-queue", type=int, default=ServiceConfig.max_queue)
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--metrics-jsonl", default=None, help="Append per-request metrics to this JSONL file")
+    parser.add_argument("--low-memory", action="store_true", help="Process one page at a time with flat memory use")
+    parser.add_argument("--ner-backend", default=ServiceConfig.ner_backend, choices=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--bert-timeout", type=float, default=ServiceConfig.bert_timeout, help="Seconds allowed for BERT NER")
+    parser.add_argument("--llm-timeout", type=float, default=ServiceConfig.llm_timeout, help="Seconds allowed for the LLM")
+    parser.add_argument("--llm-base-url", default=None, help="OpenAI-compatible LLM server, e.g. http://127.0.0.1:8000/v1")
+    parser.add_argument("--llm-model", default=ServiceConfig.llm_model)
+    args = parser.parse_args(argv)
+
+    config = ServiceConfig(
+        host=args.host, port=args.port, workers=args.workers, max_queue=args.max_queue,
+        cache_dir=args.cache_dir, metrics_jsonl=args.metrics_jsonl, low_memory=args.low_memory,
+        ner_backend=args.ner_backend, bert_timeout=args.bert_timeout, llm_timeout=args.llm_timeout,
+        llm_base_url=args.llm_base_url, llm_model=args.llm_model,
+    )
+    try:
+        web.run_app(VerificationService(config).create_app(), host=config.host, port=config.port)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    main()
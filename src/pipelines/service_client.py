@@ -0,0 +1,60 @@
+import json
+import sys
+import time
+import requests
+from src.exception import CustomException
+
+
+class ServiceClient:
+    """
+    Client of the local verification service (src/pipelines/service.py).
+    PDFs can be given as a path or as bytes; 429 answers are retried after the
+    service's Retry-After delay.
+    """
+
+    def __init__(self, base_url="http://127.0.0.1:8765", timeout=600, retries=5):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.session = requests.Session()
+
+    def verify(self, pdf, template, selective=False):
+        """Return (compliance_report, extracted_format), like FormatVerifierPipeline.initiate_format_verification."""
+        data = {"template": json.dumps(template), "selective": "true" if selective else "false"}
+        result = self._post("/verify", pdf, data)
+        return (result["compliance_report"], result["extracted_format"])
+
+    def metadata(self, pdf):
+        """Return (bert_metadata, llama_metadata); sets of the BERT metadata come back as sorted lists."""
+        result = self._post("/metadata", pdf, {})
+        return (result["bert"], result["llama"])
+
+    def status(self):
+        response = self.session.get(f"{self.base_url}/status", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _post(self, route, pdf, data):
+        try:
+            if isinstance(pdf, (bytes, bytearray, memoryview)):
+                pdf_bytes = bytes(pdf)
+            else:
+                with open(pdf, "rb") as f:
+                    pdf_bytes = f.read()
+
+            for attempt in range(self.retries + 1):
+                response = self.session.post(
+                    f"{self.base_url}{route}",
+                    files={"pdf": ("document.pdf", pdf_bytes, "application/pdf")},
+                    data=data,
+                    timeout=self.timeout,
+                )
+                if response.status_code != 429 or attempt == self.retries:
+                    break
+                time.sleep(float(response.headers.get("Retry-After", 1)))  # Service is busy, back off
+
+            if response.status_code != 200:
+                raise RuntimeError(f"{route} failed with {response.status_code}: {response.text}")
+            return response.json()
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -1,6 +1,6 @@
 import re
-import fitz
 import os
+from src.components.document_source import open_document
 # Define Label Mapping (Adjust according to your model)
 label_list = ["O", "B-AUTHOR", "I-AUTHOR", "B-ROLL_NUM",
               "B-ORG", "I-ORG", "B-SUPERVISOR", "I-SUPERVISOR", "B-DATE", "I-DATE"]
@@ -43,8 +43,8 @@ def clean_pdf_text(text):
     text = re.sub(r"[^a-zA-Z0-9.,\s]", "", text)  # Remove unwanted characters
     text = re.sub(r"\s+", " ", text).strip()  # Remove extra spaces
     return text
-def extract_first_page_text(pdf_path):
-        doc = fitz.open(pdf_path)  # Open PDF
+def extract_first_page_text(pdf):
+        doc = open_document(pdf).doc  # Path, in-memory bytes, or the DocumentSource already opened for the request
         first_page_text = doc[0].get_text("text")  # Extract text from first page
         return first_page_text.strip()
 def convert_ner_results(ner_results):